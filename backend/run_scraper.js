@@ -2,6 +2,8 @@ import { spawn } from 'child_process';
 import path from 'path';
 import { fileURLToPath } from 'url';
 import fs from 'fs';
+import readline from 'readline';
+import { ScraperWorker } from './src/scraper_worker.js';
 
 // Get the directory of the current script
 const __dirname = path.dirname(fileURLToPath(import.meta.url));
@@ -15,34 +17,92 @@ if (!fs.existsSync(scriptPath)) {
   process.exit(1);
 }
 
-console.log(`Running Python script: ${scriptPath}`);
-
-// Run the Python scraper using the system Python
-const pythonExecutable = process.platform === 'win32' ? 'python' : 'python3';
-const pythonProcess = spawn(pythonExecutable, [scriptPath], { 
-  stdio: 'inherit', // This will pipe the output directly to the console
-  cwd: __dirname
-});
-
-pythonProcess.on('close', (code) => {
-  console.log(`Scraper exited with code ${code}`);
-  
-  // Check results file
-  const resultPath = path.join(__dirname, 'data', 'user_completed_courses.json');
-  if (code === 0 && fs.existsSync(resultPath)) {
-    console.log(`Results saved to: ${resultPath}`);
-    
-    // Display number of courses scraped
+const useWorker = process.argv.includes('--worker');
+const scriptArgs = process.argv.slice(2).filter((arg) => arg !== '--worker');
+
+function printCourse(course, index) {
+  console.log(`Course ${index}: ${course.course_code} ${course.term} (${course.grade})`);
+}
+
+// Headless scrape through the persistent worker, the way a long-running
+// server would run every scrape; needs the username and password arguments
+async function runWithWorker() {
+  const [username, password] = scriptArgs.filter((arg) => !arg.startsWith('--'));
+  const worker = new ScraperWorker({ cwd: __dirname });
+  let streamed = 0;
+  try {
+    await worker.start();
+    console.log('Scrape worker ready');
+    const job = await worker.scrape({
+      username,
+      password,
+      onCourse: (course) => printCourse(course, ++streamed)
+    });
+    console.log(job.result?.message ?? job.error);
+    console.log(`Job ${job.status}: ${streamed} courses streamed, ` +
+      `queued ${job.queue_seconds}s, ran ${job.run_seconds}s`);
+    const health = await worker.health();
+    console.log(`Worker queue: ${health.scrape.queued} waiting, ${health.scrape.running} running`);
+  } catch (error) {
+    console.error(`Scrape worker failed: ${error.message}`);
+  } finally {
+    await worker.stop();
+  }
+}
+
+// Interactive one-off run in NDJSON mode: one JSON record per line on
+// stdout, logs on stderr
+function runOnce() {
+  console.log(`Running Python script: ${scriptPath}`);
+
+  const pythonExecutable = process.platform === 'win32' ? 'python' : 'python3';
+  const pythonProcess = spawn(pythonExecutable, [scriptPath, '--ndjson', ...scriptArgs], {
+    stdio: ['inherit', 'pipe', 'inherit'], // Keep the login prompt and logs on the console
+    cwd: __dirname
+  });
+
+  const courses = [];
+  let summary = null;
+
+  // Show each course as soon as the scraper emits it
+  const lines = readline.createInterface({ input: pythonProcess.stdout });
+  lines.on('line', (line) => {
+    if (!line.trim()) return;
+    let record;
     try {
-      const data = fs.readFileSync(resultPath, 'utf8');
-      const courses = JSON.parse(data);
-      console.log(`Successfully scraped ${courses.length} courses`);
+      record = JSON.parse(line);
     } catch (error) {
-      console.error(`Error reading results file: ${error.message}`);
+      console.error(`Ignoring unparseable scraper output: ${line}`);
+      return;
     }
-  }
-});
+    if (record.type === 'course') {
+      const { type, ...course } = record;
+      courses.push(course);
+      printCourse(course, courses.length);
+    } else if (record.type === 'summary') {
+      summary = record;
+    }
+  });
+
+  pythonProcess.on('close', (code) => {
+    console.log(`Scraper exited with code ${code}`);
+
+    if (summary) {
+      console.log(summary.message);
+      console.log(`Successfully scraped ${summary.courses} courses (${courses.length} streamed, ` +
+        `first after ${summary.first_course_ms ?? '-'} ms, total ${summary.elapsed_ms} ms)`);
+    } else {
+      console.error('Scraper exited without a summary record');
+    }
+  });
+
+  pythonProcess.on('error', (err) => {
+    console.error(`Failed to start scraper process: ${err.message}`);
+  });
+}
 
-pythonProcess.on('error', (err) => {
-  console.error(`Failed to start scraper process: ${err.message}`);
-}); 
\ No newline at end of file
+if (useWorker) {
+  runWithWorker();
+} else {
+  runOnce();
+}
@@ -0,0 +1,137 @@
+import { spawn } from 'child_process';
+import { EventEmitter } from 'events';
+import path from 'path';
+import readline from 'readline';
+import { fileURLToPath } from 'url';
+
+const __dirname = path.dirname(fileURLToPath(import.meta.url));
+const workerScript = path.join(__dirname, 'scrapers', 'scrape_worker.py');
+const pythonExecutable = process.platform === 'win32' ? 'python' : 'python3';
+
+/**
+ * Client for the long-running Python scrape worker (scrape_worker.py).
+ * One process serves every request, so interpreter start-up and the
+ * selenium imports are paid once instead of on every scrape.
+ */
+export class ScraperWorker extends EventEmitter {
+  constructor({ workers = 2, maxQueue = 20, warmBrowsers = false, cwd = path.join(__dirname, '..') } = {}) {
+    super();
+    this.args = [workerScript, '--workers', String(workers), '--max-queue', String(maxQueue)];
+    if (warmBrowsers) this.args.push('--warm-browsers');
+    this.cwd = cwd;
+    this.process = null;
+    this.pending = new Map();
+    this.nextId = 1;
+  }
+
+  start() {
+    if (this.process) return this.ready;
+    this.process = spawn(pythonExecutable, this.args, {
+      stdio: ['pipe', 'pipe', 'inherit'], // Worker logs go straight to our stderr
+      cwd: this.cwd
+    });
+    let started = false;
+    this.ready = new Promise((resolve, reject) => {
+      this.once('ready', (message) => {
+        started = true;
+        resolve(message);
+      });
+      this.process.once('error', reject);
+      this.rejectReady = reject;
+    });
+
+    const lines = readline.createInterface({ input: this.process.stdout });
+    lines.on('line', (line) => this.handleLine(line));
+
+    this.process.on('close', (code) => {
+      for (const { reject } of this.pending.values()) {
+        reject(new Error(`Scrape worker exited with code ${code}`));
+      }
+      this.pending.clear();
+      if (!started) {
+        // Exited before it was ready (import error, bad interpreter): fail start()
+        this.rejectReady(new Error(`Scrape worker exited with code ${code} before it was ready`));
+      }
+      this.process = null;
+      this.ready = null;
+      this.emit('exit', code);
+    });
+    return this.ready;
+  }
+
+  handleLine(line) {
+    let message;
+    try {
+      message = JSON.parse(line);
+    } catch (error) {
+      console.error(`Ignoring unparseable worker output: ${line}`);
+      return;
+    }
+    if (message.id === null) {
+      // Worker-level events: ready, stopped, unparseable requests
+      if (message.type === 'error') {
+        console.error(`Scrape worker: ${message.error}`);
+      } else {
+        this.emit(message.type, message);
+      }
+      return;
+    }
+    const request = this.pending.get(message.id);
+    if (!request) return;
+    if (message.type === 'course') {
+      request.onCourse?.(message.course);
+    } else if (message.type === 'accepted') {
+      request.onAccepted?.(message.job_id);
+    } else {
+      this.pending.delete(message.id);
+      if (message.type === 'error') {
+        const error = new Error(message.error);
+        error.code = message.code;
+        request.reject(error);
+      } else {
+        request.resolve(message);
+      }
+    }
+  }
+
+  async request(op, payload = {}, { onCourse, onAccepted } = {}) {
+    await this.start();
+    const id = String(this.nextId++);
+    return new Promise((resolve, reject) => {
+      this.pending.set(id, { resolve, reject, onCourse, onAccepted });
+      this.process.stdin.write(JSON.stringify({ id, op, ...payload }) + '\n');
+    });
+  }
+
+  /** Scrape one user's course history; resolves with the finished job */
+  async scrape({ username, password, onCourse } = {}) {
+    const { job } = await this.request('scrape', { username, password, stream: Boolean(onCourse) }, { onCourse });
+    return job;
+  }
+
+  async parse(filePath) {
+    const { courses } = await this.request('parse', { path: filePath });
+    return courses;
+  }
+
+  async requirements(codes) {
+    const { requirements } = await this.request('requirements', { codes });
+    return requirements;
+  }
+
+  health() {
+    return this.request('health');
+  }
+
+  /** Let queued jobs finish, then stop the worker */
+  stop() {
+    if (!this.process) return Promise.resolve();
+    return new Promise((resolve) => {
+      this.once('exit', resolve);
+      this.process.stdin.write(JSON.stringify({ id: null, op: 'shutdown' }) + '\n');
+      this.process.stdin.end();
+    });
+  }
+}
+
+export default ScraperWorker;
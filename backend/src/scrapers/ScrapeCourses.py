@@ -5,19 +5,484 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from webdriver_manager.chrome import ChromeDriverManager
-import pickle
+from requests.adapters import HTTPAdapter
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from course_history_parser import build_course_info, parse_course_history_html, is_course_history_page, unique_courses
+from page_state import PageState, PageStatus, LOGGED_IN_STATES, FAILURE_STATES, classify_page, classify_driver
+from browser_pool import BrowserPool
+from scrape_metrics import span, traced, start_run, finish_run
+from diagnostics import DiagnosticsRecorder
+from session_store import SessionStore, live_cookies
+from course_history_store import load_history, save_history, frozen_terms, merge_rows, history_courses, row_key
+from academics_parser import parse_academics_html, is_academics_page
+from peoplesoft_grid_parser import parse_grid_html, is_component_page
+import requests
+import threading
 import os
 import time
 import json
-import re
-from selenium.common.exceptions import TimeoutException, NoSuchFrameException
+from selenium.common.exceptions import TimeoutException, NoSuchFrameException, WebDriverException
 
 LOGIN_URL = "https://myslice.ps.syr.edu/"
 ACADEMIC_PROGRESS_URL = "https://cs92prod.ps.syr.edu/psc/CS92PROD/EMPLOYEE/SA/c/NUI_FRAMEWORK.PT_AGSTARTPAGE_NUI.GBL?CONTEXTIDPARAMS=TEMPLATE_ID%3aPTPPNAVCOL&scname=SYRNAV_ACADEMICS_001&PanelCollapsible=Y&PortalActualURL=https%3a%2f%2fcs92prod.ps.syr.edu%2fpsc%2fCS92PROD%2fEMPLOYEE%2fSA%2fc%2fNUI_FRAMEWORK.PT_AGSTARTPAGE_NUI.GBL%3f%26scname%3dSYRNAV_ACADEMICS_001%26PanelCollapsible%3dY&PortalRegistryName=EMPLOYEE&PortalServletURI=https%3a%2f%2fmyslice.ps.syr.edu%2fpsp%2fPTL9PROD%2f&PortalURI=https%3a%2f%2fmyslice.ps.syr.edu%2fpsc%2fPTL9PROD%2f&PortalHostNode=EMPL&NoCrumbs=yes"
+COURSE_HISTORY_URL = "https://cs92prod.ps.syr.edu/psc/CS92PROD/EMPLOYEE/SA/c/SA_LEARNER_SERVICES.SSS_MY_CRSEHIST.GBL"
+PEOPLESOFT_COMPONENT_URL = "https://cs92prod.ps.syr.edu/psc/CS92PROD/EMPLOYEE/SA/c/{menu}.{component}"
+# Record views linked from the Academics steps (plus the class schedule), as menu.component
+RECORD_VIEWS = {
+    "academic_program": "SA_LEARNER_SERVICES.SYR_SSS_MY_ACAD.GBL",
+    "grades": "SA_LEARNER_SERVICES.SSR_SSENRL_GRADE.GBL",
+    "enrollment": "SA_LEARNER_SERVICES.SSR_SSENRL_LIST.GBL",
+    "transfer_credit": "SA_LEARNER_SERVICES.SYR_TXFER_CR_REP.GBL",
+}
+# Views fetched alongside Course History in the same session: URL, page check, parser.
+# academic_progress is the Academics navigation collection itself, so it only
+# yields the step links (Course History, Grades, ...), not record data.
+PEOPLESOFT_VIEWS = {
+    "academic_progress": (ACADEMIC_PROGRESS_URL, is_academics_page,
+                          lambda html: {"steps": parse_academics_html(html)}),
+    **{
+        name: (PEOPLESOFT_COMPONENT_URL.format(menu=path.split(".", 1)[0], component=path.split(".", 1)[1]),
+               is_component_page(path.split(".", 1)[1]),
+               lambda html: {"rows": parse_grid_html(html)})
+        for name, path in RECORD_VIEWS.items()
+    },
+}
+# These views load the same PeopleSoft component (SYRNAV_ACADEMICS_001) that the
+# browser flow walks through to reach Course History. PeopleSoft keeps one
+# state per component and session, so in the browser these are only opened
+# once Course History has been scraped, never in a second tab at the same time.
+MAIN_COMPONENT_VIEWS = {"academic_progress"}
+# The record views are fetched by default; academic_progress only adds links
+# and has to wait for the main tab, so it is opt-in via SCRAPER_EXTRA_VIEWS
+EXTRA_VIEWS = tuple(name for name in os.environ.get("SCRAPER_EXTRA_VIEWS", ",".join(RECORD_VIEWS)).split(",") if name)
+# Legacy cookie jar, only read once to seed the session store
 COOKIE_FILE = "degree_works_cookies.pkl"
+# Session store key for MySlice/PeopleSoft and its auth cookie
+MYSLICE_SESSION_DOMAIN = "ps.syr.edu"
+# Origins whose storage a pooled browser must drop before serving another user
+PEOPLESOFT_ORIGINS = ["https://myslice.ps.syr.edu", "https://cs92prod.ps.syr.edu"]
+MYSLICE_AUTH_COOKIES = ["PS_TOKEN"]
+DEFAULT_SESSION_USER = os.environ.get("SCRAPER_USER", "default")
 
-def setup_driver(headless=False):
-    """Set up and return a configured Chrome WebDriver"""
+# Browserless fast path: one pooled adapter shared by every cookie session
+HTTP_TIMEOUT = 20
+HTTP_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml",
+}
+# Never close a session mounted on it: Session.close() would clear these pools for everyone
+http_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+
+# Warm browser pool used by the backend entry point
+BROWSER_POOL_SIZE = int(os.environ.get("SCRAPER_BROWSER_POOL_SIZE", "2"))
+BROWSER_MAX_USES = int(os.environ.get("SCRAPER_BROWSER_MAX_USES", "20"))
+browser_pool = None
+browser_pool_lock = threading.Lock()
+chromedriver_path = None
+chromedriver_lock = threading.Lock()
+
+# Lean profile: skip images, fonts, media and third-party hosts the scrape never reads
+LEAN_PROFILE = os.environ.get("SCRAPER_LEAN_PROFILE", "1") == "1"
+LEAN_BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.svg", "*.webp", "*.ico", "*.bmp",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.mp3",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*fonts.googleapis.com*", "*fonts.gstatic.com*", "*facebook.net*", "*hotjar.com*",
+]
+# Hosts that still resolve under the lean profile: PeopleSoft and the SSO/2FA login chain
+LEAN_ALLOWED_HOSTS = [
+    "syr.edu", "*.syr.edu",
+    "login.microsoftonline.com", "*.msauth.net", "*.msftauth.net", "*.duosecurity.com",
+    "localhost", "127.0.0.1",
+]
+LEAN_CHROME_PREFS = {
+    "profile.managed_default_content_settings.images": 2,
+    "profile.managed_default_content_settings.plugins": 2,
+    "profile.managed_default_content_settings.geolocation": 2,
+    "profile.managed_default_content_settings.media_stream": 2,
+}
+# Bytes and load time of the current document so far, via the Performance API.
+# Cross-origin resources without Timing-Allow-Origin report a transferSize of 0.
+PAGE_METRICS_SCRIPT = """
+performance.setResourceTimingBufferSize(5000);
+const nav = performance.getEntriesByType('navigation')[0];
+const resources = performance.getEntriesByType('resource');
+return {
+    origin: performance.timeOrigin,
+    load_ms: nav ? Math.round(nav.loadEventEnd || nav.duration) : null,
+    bytes: (nav ? nav.transferSize : 0) + resources.reduce((sum, r) => sum + (r.transferSize || 0), 0),
+    requests: resources.length + (nav ? 1 : 0),
+};
+"""
+# Waits after which the page has settled on a new navigation step
+PAGE_METRIC_STEPS = ["cookie_refresh", "dashboard_ready", "academics_loaded", "course_history_loaded", "iframe_loaded"]
+
+# Timeout budget (seconds) for each condition-based wait in the navigation flow
+WAIT_BUDGETS = {
+    "cookie_page_load": 10,
+    "cookie_refresh": 15,
+    "timeout_refresh": 15,
+    "timeout_login_page": 15,
+    "login_status": 5,
+    "dashboard_ready": 20,
+    "scroll_into_view": 2,
+    "academics_loaded": 20,
+    "course_history_loaded": 20,
+    "iframe_loaded": 10,
+    "extra_view": 20,
+    "unattended_login": 10,
+}
+DASHBOARD_MARKER_IDS = ["win0divPTNUI_LAND_REC_GROUPLET$0", "ptifrmtgtframe", "pthdr2container"]
+COURSE_HISTORY_LINK_ID = "win9divPTGP_STEP_DVW_PTGP_STEP_BTN_GB$1"
+
+# True once the document has loaded and PeopleSoft's processing indicator is hidden
+PEOPLESOFT_IDLE_SCRIPT = """
+if (document.readyState !== 'complete') return false;
+const busy = document.getElementById('WAIT_win0') || document.getElementById('processing');
+return !busy || busy.offsetParent === null;
+"""
+# True once an iframe is showing the Course History component
+COURSE_HISTORY_FRAME_SCRIPT = """
+return Array.from(document.querySelectorAll('iframe')).some((f) => (f.src || '').includes('SSS_MY_CRSEHIST'));
+"""
+IN_VIEWPORT_SCRIPT = """
+const rect = arguments[0].getBoundingClientRect();
+return rect.top >= 0 && rect.bottom <= (window.innerHeight || document.documentElement.clientHeight);
+"""
+
+class RunContext(threading.local):
+    """Per-thread state of the current scrape, so concurrent jobs never share files.
+
+    workdir receives diagnostics and output files, user keys the session
+    store, cookie_file is a legacy jar to import when that user has no
+    stored session, wait_timings records the duration of every wait,
+    page_metrics the bytes and load time per navigation step,
+    diagnostics the ring buffer of screenshots taken during the run,
+    course_sink, when set, is called with each course as it is extracted,
+    emitted holds the code+term keys already handed to it,
+    interactive says whether a person can answer prompts and
+    login_required is set when an unattended run hit a manual login step.
+    """
+
+    def __init__(self):
+        self.workdir = "."
+        self.user = DEFAULT_SESSION_USER
+        self.cookie_file = COOKIE_FILE
+        self.wait_timings = []
+        self.page_metrics = []
+        self.diagnostics = DiagnosticsRecorder()
+        self.course_sink = None
+        self.emitted = set()
+        self.interactive = True
+        self.login_required = False
+
+run_context = RunContext()
+session_store = None
+
+def get_session_store():
+    global session_store
+    if session_store is None:
+        session_store = SessionStore()
+    return session_store
+
+@contextmanager
+def job_context(workdir, cookie_file=None, user=None):
+    """Run the scrape in this thread against its own working dir and session"""
+    os.makedirs(workdir, exist_ok=True)
+    saved = (run_context.workdir, run_context.user, run_context.cookie_file, run_context.wait_timings,
+             run_context.page_metrics, run_context.diagnostics)
+    run_context.workdir = workdir
+    run_context.user = user or DEFAULT_SESSION_USER
+    run_context.cookie_file = cookie_file or os.path.join(workdir, COOKIE_FILE)
+    run_context.wait_timings = []
+    run_context.page_metrics = []
+    run_context.diagnostics = DiagnosticsRecorder()
+    try:
+        yield run_context
+    finally:
+        (run_context.workdir, run_context.user, run_context.cookie_file, run_context.wait_timings,
+         run_context.page_metrics, run_context.diagnostics) = saved
+
+def emit_course(course):
+    """Hand a freshly extracted course to the run's streaming consumer, if any.
+
+    Rows are filtered like unique_courses: blank codes are dropped and only
+    the first row per code+term is passed on, so the stream carries exactly
+    the rows of the final result.
+    """
+    if run_context.course_sink is None or not course['course_code']:
+        return
+    key = row_key(course)
+    if key in run_context.emitted:
+        return
+    run_context.emitted.add(key)
+    run_context.course_sink(course)
+
+def run_path(filename):
+    return os.path.join(run_context.workdir, filename)
+
+def capture(driver, name, error=False):
+    """Buffer a diagnostic screenshot; it is only written to disk if the run fails"""
+    run_context.diagnostics.capture(driver, name, error)
+
+def timed_wait(driver, label, condition, timeout=None):
+    """Wait until condition(driver) is truthy, recording how long it took.
+
+    Replaces fixed sleeps: returns as soon as the page is ready, and on
+    timeout logs and returns False instead of raising, like the sleep it
+    replaces would have carried on.
+    """
+    timeout = WAIT_BUDGETS[label] if timeout is None else timeout
+    start = time.monotonic()
+    with span(f"wait.{label}"):
+        try:
+            WebDriverWait(driver, timeout, poll_frequency=0.1,
+                          ignored_exceptions=(WebDriverException,)).until(condition)
+            ok = True
+        except TimeoutException:
+            ok = False
+    elapsed = time.monotonic() - start
+    run_context.wait_timings.append({"wait": label, "seconds": round(elapsed, 3), "timed_out": not ok})
+    print(f"⏱️ {label}: {elapsed:.2f}s" + ("" if ok else f" (timed out after {timeout}s)"))
+    if label in PAGE_METRIC_STEPS:
+        record_page_metrics(driver, label)
+    return ok
+
+def record_page_metrics(driver, step):
+    """Record bytes transferred since the previous step and the document's load time"""
+    try:
+        metrics = driver.execute_script(PAGE_METRICS_SCRIPT)
+    except WebDriverException:
+        return
+    # PeopleSoft steps often stay in the same document, so report the delta
+    previous = next((m for m in reversed(run_context.page_metrics) if m["origin"] == metrics["origin"]), None)
+    run_context.page_metrics.append({
+        "step": step,
+        "origin": metrics["origin"],
+        "load_ms": metrics["load_ms"],
+        "bytes": metrics["bytes"] - (previous["total_bytes"] if previous else 0),
+        "requests": metrics["requests"] - (previous["total_requests"] if previous else 0),
+        "total_bytes": metrics["bytes"],
+        "total_requests": metrics["requests"],
+    })
+
+def report_page_metrics():
+    """Print bytes and load time per navigation step of this run"""
+    if not run_context.page_metrics:
+        return
+    total = sum(m["bytes"] for m in run_context.page_metrics)
+    print(f"\n📦 Transferred {total / 1024:.1f} KiB over {len(run_context.page_metrics)} steps:")
+    for m in run_context.page_metrics:
+        print(f"   {m['step']:<24} {m['bytes'] / 1024:>9.1f} KiB {m['requests']:>4} req  load {m['load_ms']} ms")
+
+def report_wait_timings():
+    """Print the waits of this run, slowest first"""
+    if not run_context.wait_timings:
+        return
+    total = sum(w["seconds"] for w in run_context.wait_timings)
+    print(f"\n⏱️ Spent {total:.2f}s in {len(run_context.wait_timings)} waits:")
+    for w in sorted(run_context.wait_timings, key=lambda w: w["seconds"], reverse=True):
+        print(f"   {w['wait']:<24} {w['seconds']:>7.2f}s{' (timed out)' if w['timed_out'] else ''}")
+
+def page_loaded(driver):
+    return driver.execute_script("return document.readyState") == "complete"
+
+def peoplesoft_idle(driver):
+    return driver.execute_script(PEOPLESOFT_IDLE_SCRIPT)
+
+def any_element_present(driver, element_ids):
+    return any(driver.find_elements(By.ID, element_id) for element_id in element_ids)
+
+def wait_for_page_state(driver, label, timeout=None):
+    """Wait until the page has loaded and matches a known state, and return that state"""
+    status = PageStatus(PageState.UNKNOWN, None)
+
+    def settled(d):
+        nonlocal status
+        if not page_loaded(d):
+            return False
+        status = classify_driver(d)
+        return status.state != PageState.UNKNOWN
+
+    timed_wait(driver, label, settled, timeout)
+    return status
+
+def scroll_into_view(driver, element):
+    driver.execute_script("arguments[0].scrollIntoView(true);", element)
+    timed_wait(driver, "scroll_into_view", lambda d: d.execute_script(IN_VIEWPORT_SCRIPT, element))
+
+def load_session_cookies():
+    """Cookies of the current user's MySlice session, or None if there is none or it clearly expired"""
+    store = get_session_store()
+    record = store.load(run_context.user, MYSLICE_SESSION_DOMAIN)
+    if record is None:
+        record = store.import_pickle(run_context.user, MYSLICE_SESSION_DOMAIN, run_context.cookie_file,
+                                     auth_cookies=MYSLICE_AUTH_COOKIES)
+        if record is None:
+            return None
+    if store.expired(record):
+        print("ℹ️ Saved MySlice session has expired, skipping cookie replay.")
+        return None
+    return live_cookies(record.cookies) or None
+
+def save_session(driver):
+    """Store the browser's cookies as the current user's live MySlice session"""
+    get_session_store().save(run_context.user, MYSLICE_SESSION_DOMAIN, driver.get_cookies(),
+                             auth_cookies=MYSLICE_AUTH_COOKIES)
+
+def cookie_http_session(cookies):
+    """Build a requests session on the shared adapter from saved browser cookies.
+
+    The session is just a cookie jar over http_adapter; drop it when done
+    instead of closing it, so other runs keep the pooled connections.
+    """
+    session = requests.Session()
+    session.mount("https://", http_adapter)
+    session.headers.update(HTTP_HEADERS)
+    for cookie in cookies:
+        # Same root domain the browser replay uses
+        session.cookies.set(cookie['name'], cookie['value'], domain='.ps.syr.edu',
+                            path=cookie.get('path', '/'), secure=cookie.get('secure', False))
+    return session
+
+def http_session_rejected(response, is_view=is_course_history_page):
+    """True when PeopleSoft answered with a login/SSO page instead of the requested view"""
+    if response.status_code in (401, 403):
+        return True
+    status = classify_page(response.content, response.url)
+    return status.state not in LOGGED_IN_STATES or not is_view(response.content)
+
+def parse_view(name, html):
+    """Parse one extra view's page, or describe why it is not that view"""
+    _, is_view, parse = PEOPLESOFT_VIEWS[name]
+    if not is_view(html):
+        return {"error": f"{name} page not recognised"}
+    try:
+        return parse(html)
+    except Exception as e:
+        return {"error": f"Could not parse {name}: {e}"}
+
+def get_timed(session, url):
+    """GET url, returning (response or exception, milliseconds)"""
+    start = time.monotonic()
+    try:
+        response = session.get(url, timeout=HTTP_TIMEOUT)
+    except requests.RequestException as e:
+        response = e
+    return response, round((time.monotonic() - start) * 1000)
+
+@traced("http_fast_path")
+def fetch_course_history_http(skip_terms=(), views=()):
+    """Fetch and parse Course History, plus any extra views, without a browser.
+
+    All pages are requested concurrently over one pooled cookie session,
+    so the wall time is that of the slowest view. Returns the unique course
+    records outside skip_terms and {view: parsed result or error}, or None
+    when there are no saved cookies or Course History was not served, so
+    the caller can fall back to the Selenium flow.
+    """
+    cookies = load_session_cookies()
+    if cookies is None:
+        return None
+    session = cookie_http_session(cookies)
+    urls = {"course_history": COURSE_HISTORY_URL, **{name: PEOPLESOFT_VIEWS[name][0] for name in views}}
+    print(f"⚡ Trying browserless fetch of {', '.join(urls)} with saved cookies...")
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=len(urls)) as executor:
+        futures = {name: executor.submit(get_timed, session, url) for name, url in urls.items()}
+        fetched = {name: future.result() for name, future in futures.items()}
+    response, _ = fetched.pop("course_history")
+    if isinstance(response, Exception):
+        print(f"ℹ️ HTTP fast path failed ({response}), falling back to the browser...")
+        return None
+    if response.status_code >= 500:
+        print(f"ℹ️ PeopleSoft returned HTTP {response.status_code}, falling back to the browser...")
+        return None
+    if http_session_rejected(response):
+        print(f"ℹ️ Saved session was rejected (HTTP {response.status_code}, {response.url}), falling back to the browser...")
+        # The browser would only replay the same dead cookies
+        get_session_store().invalidate(run_context.user, MYSLICE_SESSION_DOMAIN)
+        return None
+    get_session_store().mark_validated(run_context.user, MYSLICE_SESSION_DOMAIN)
+    courses = unique_courses(row for row in parse_course_history_html(response.content)
+                             if row['term'] not in skip_terms)
+    for course in courses:
+        emit_course(course)
+
+    view_results = {}
+    for name, (view_response, elapsed_ms) in fetched.items():
+        if isinstance(view_response, Exception):
+            view_results[name] = {"error": str(view_response)}
+        elif view_response.status_code >= 400 or http_session_rejected(view_response, PEOPLESOFT_VIEWS[name][1]):
+            view_results[name] = {"error": f"HTTP {view_response.status_code} from {view_response.url}"}
+        else:
+            view_results[name] = parse_view(name, view_response.content)
+        view_results[name]["ms"] = elapsed_ms
+    print(f"✅ Fetched {len(courses)} courses and {len(view_results)} extra views over HTTP "
+          f"in {time.monotonic() - start:.2f}s.")
+    return courses, view_results
+
+def open_view_tabs(driver, views):
+    """Start loading each extra view in its own background tab and return {view: (handle, start)}.
+
+    window.open does not wait for the page, so the views load while the
+    main tab walks to Course History.
+    """
+    main = driver.current_window_handle
+    tabs = {}
+    for name in views:
+        known = set(driver.window_handles)
+        try:
+            driver.execute_script("window.open(arguments[0], '_blank');", PEOPLESOFT_VIEWS[name][0])
+            handle = next(h for h in driver.window_handles if h not in known)
+            tabs[name] = (handle, time.monotonic())
+        except Exception as e:
+            print(f"⚠️ Could not open a tab for {name}: {e}")
+        finally:
+            driver.switch_to.window(main)
+    return tabs
+
+@traced("collect_views")
+def collect_view_tabs(driver, tabs):
+    """Parse and close the tabs opened by open_view_tabs, returning {view: result}"""
+    main = driver.current_window_handle
+    results = {}
+    for name, (handle, start) in tabs.items():
+        try:
+            driver.switch_to.window(handle)
+            timed_wait(driver, f"view_{name}", peoplesoft_idle, WAIT_BUDGETS["extra_view"])
+            results[name] = parse_view(name, driver.page_source)
+            results[name]["ms"] = round((time.monotonic() - start) * 1000)
+            driver.close()
+        except Exception as e:
+            results[name] = {"error": str(e)}
+        finally:
+            driver.switch_to.window(main)
+    return results
+
+@traced("output_write")
+def save_courses(courses, output_file):
+    with open(run_path(output_file), "w") as f:
+        json.dump(courses, f, indent=2)
+
+def resolve_chromedriver():
+    """Resolve the chromedriver binary once per process instead of on every launch"""
+    global chromedriver_path
+    with chromedriver_lock:
+        if chromedriver_path is None:
+            chromedriver_path = ChromeDriverManager().install()
+        return chromedriver_path
+
+@traced("driver_setup")
+def setup_driver(headless=False, user_data_dir=None, lean=False):
+    """Set up and return a configured Chrome WebDriver.
+
+    With lean, images and plugins are disabled through Chrome prefs, only
+    LEAN_ALLOWED_HOSTS resolve, and LEAN_BLOCKED_URL_PATTERNS are blocked
+    over the DevTools protocol.
+    """
     chrome_options = Options()
     chrome_options.add_argument("--start-maximized")
     chrome_options.add_argument("--disable-notifications")
@@ -27,11 +492,59 @@ def setup_driver(headless=False):
     
     if headless:
         chrome_options.add_argument("--headless")
+    if user_data_dir:
+        # Isolated profile so pooled browsers never share cookies or cache
+        chrome_options.add_argument(f"--user-data-dir={user_data_dir}")
+    if lean:
+        chrome_options.add_experimental_option("prefs", LEAN_CHROME_PREFS)
+        excluded = ", ".join(f"EXCLUDE {host}" for host in LEAN_ALLOWED_HOSTS)
+        chrome_options.add_argument(f"--host-resolver-rules=MAP * ~NOTFOUND, {excluded}")
     
-    service = Service(ChromeDriverManager().install())
+    service = Service(resolve_chromedriver())
     driver = webdriver.Chrome(service=service, options=chrome_options)
+    if lean:
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": LEAN_BLOCKED_URL_PATTERNS})
+        except WebDriverException as e:
+            print(f"ℹ️ Could not apply lean URL blocking: {e}")
     return driver
 
+def get_browser_pool(warm=True):
+    """Return the process-wide pool of headless browsers, creating it on first use.
+
+    With warm, every browser is launched up front; otherwise they start on
+    their first lease. Only long-lived processes should use the pool, and
+    they must close() it on shutdown, or Chrome and its profile outlive them.
+    """
+    global browser_pool
+    with browser_pool_lock:
+        if browser_pool is None:
+            browser_pool = BrowserPool(lambda profile_dir: setup_driver(headless=True, user_data_dir=profile_dir, lean=LEAN_PROFILE),
+                                       size=BROWSER_POOL_SIZE, max_uses=BROWSER_MAX_USES, warm=False,
+                                       origins=PEOPLESOFT_ORIGINS)
+    if warm:
+        browser_pool.warm()
+    return browser_pool
+
+def wait_for_user(driver, prompt):
+    """Let the user finish a login step in the browser; False if the page is not logged in.
+
+    Unattended runs never read stdin (a worker's stdin is its request
+    pipe): they give the page a few seconds to reach the dashboard on its
+    own and otherwise flag the run as needing a manual login.
+    """
+    if run_context.interactive:
+        input(prompt)
+        return True
+    status = wait_for_page_state(driver, "unattended_login")
+    if status.state in LOGGED_IN_STATES:
+        return True
+    print(f"🔒 Unattended run stopped at a manual login step ({status.state.value}).")
+    run_context.login_required = True
+    return False
+
+@traced("manual_login")
 def prepare_login(driver, username=None, password=None):
     """Navigate to login page and guide users through login and 2FA verification"""
     print("🔑 Opening MySlice login page...")
@@ -65,14 +578,17 @@ def prepare_login(driver, username=None, password=None):
                     login_button.click()
                     
                     print("✅ Credentials submitted. Please complete 2FA if required.")
-                    input("--> Press Enter AFTER you have completed 2FA and see the MySlice dashboard...")
+                    if not wait_for_user(driver, "--> Press Enter AFTER you have completed 2FA and see the MySlice dashboard..."):
+                        return False
                 except Exception as e:
                     print(f"⚠️ Error during automated login: {e}")
                     print("   Falling back to manual login...")
-                    input("--> Press Enter AFTER you have completed the login and 2FA...")
+                    if not wait_for_user(driver, "--> Press Enter AFTER you have completed the login and 2FA..."):
+                        return False
             else:
                 print("   Please complete the login process (NetID, password, 2FA).")
-                input("--> Press Enter AFTER you have completed the SAML login and see the MySlice dashboard...")
+                if not wait_for_user(driver, "--> Press Enter AFTER you have completed the SAML login and see the MySlice dashboard..."):
+                    return False
         else:
             # Found the initial landing page with login buttons
             print("\n===========================================================")
@@ -81,27 +597,29 @@ def prepare_login(driver, username=None, password=None):
             print("2. Complete the login process (NetID, password, 2FA).")
             print("3. Wait until you are fully logged in and can see the MySlice dashboard.")
             print("===========================================================\n")
-            input("--> Press Enter ONLY AFTER you have successfully logged in and see the MySlice dashboard...")
+            if not wait_for_user(driver, "--> Press Enter ONLY AFTER you have successfully logged in and see the MySlice dashboard..."):
+                return False
 
     except Exception as e:
         print(f"⚠️ Error waiting for initial MySlice page elements or SAML redirect: {e}")
         print("   The page structure might have changed, or the page didn't load correctly.")
-        driver.save_screenshot("initial_page_error.png")
+        capture(driver, "initial_page_error", error=True)
         return False # Indicate login preparation failed
 
     # Take a screenshot to verify dashboard state after user confirmation
-    print("📸 Taking screenshot of expected dashboard state...")
-    driver.save_screenshot("login_completed_dashboard.png")
+    print("📸 Capturing expected dashboard state...")
+    capture(driver, "login_completed_dashboard")
     
     # Check login status again to confirm we're likely on the dashboard
     print("🕵️ Verifying login status...")
     if not check_login_status(driver):
         print("⚠️ Login status check failed. May not be on the dashboard.")
         print("   Please ensure you pressed Enter only *after* seeing the MySlice dashboard.")
-        driver.save_screenshot("login_status_check_failed.png")
+        capture(driver, "login_status_check_failed", error=True)
         # Consider returning False for stricter error handling
         # return False 
-        input("   Press Enter again if you are definitely on the dashboard, otherwise stop the script.")
+        if not wait_for_user(driver, "   Press Enter again if you are definitely on the dashboard, otherwise stop the script."):
+            return False
         # Re-check status after second confirmation if needed
         if not check_login_status(driver):
              print("❌ Login status check failed again. Aborting.")
@@ -110,7 +628,7 @@ def prepare_login(driver, username=None, password=None):
 
     # Save cookies after successful login confirmation
     try:
-        pickle.dump(driver.get_cookies(), open(COOKIE_FILE, "wb"))
+        save_session(driver)
         print("✅ Login confirmed! Cookies saved for future use.")
         return True
     except Exception as e:
@@ -118,10 +636,12 @@ def prepare_login(driver, username=None, password=None):
         # Decide if failure to save cookies should halt the process
         return False # Example: fail if cookies can't be saved
 
+@traced("cookie_login")
 def login_with_cookies(driver):
     """Try to login using saved cookies, with handling for potential 2FA prompts"""
-    if not os.path.exists(COOKIE_FILE):
-        print("⚠️ No saved cookies found. You'll need to log in manually.")
+    cookies = load_session_cookies()
+    if cookies is None:
+        print("⚠️ No live saved session found. You'll need to log in manually.")
         return False
     
     print("🔄 Attempting to use saved cookies...")
@@ -131,10 +651,9 @@ def login_with_cookies(driver):
     driver.delete_all_cookies()
     
     # Wait for the page to load before adding cookies
-    time.sleep(2)
+    timed_wait(driver, "cookie_page_load", page_loaded)
     
     try:
-        cookies = pickle.load(open(COOKIE_FILE, "rb"))
         for cookie in cookies:
             try:
                 # Update cookie domain to match current domain
@@ -142,103 +661,79 @@ def login_with_cookies(driver):
                 driver.add_cookie(cookie)
             except Exception as e:
                 print(f"⚠️ Error adding cookie: {e}")
-                # If cookies fail, delete the cookie file and force fresh login
-                os.remove(COOKIE_FILE)
-                print("⚠️ Invalid cookies detected. Cookie file deleted. Manual login required.")
+                # If cookies fail, drop the stored session and force fresh login
+                get_session_store().invalidate(run_context.user, MYSLICE_SESSION_DOMAIN)
+                print("⚠️ Invalid cookies detected. Saved session dropped. Manual login required.")
                 return False
         
         # Refresh to apply cookies
         driver.refresh()
-        time.sleep(3)
+        status = wait_for_page_state(driver, "cookie_refresh")
         
         # Check if we're on a SAML page
-        if "saml" in driver.current_url.lower():
+        if status.state == PageState.SAML:
             print("🔐 SAML authentication required. Please complete the login process...")
-            input("Press Enter AFTER you have completed the SAML login and 2FA...")
-            return True
+            return wait_for_user(driver, "Press Enter AFTER you have completed the SAML login and 2FA...")
         
         # Check if login was successful
-        if check_login_status(driver):
+        if check_login_status(driver, status):
             print("✅ Successfully logged in with saved cookies!")
+            get_session_store().mark_validated(run_context.user, MYSLICE_SESSION_DOMAIN)
             return True
         else:
             # Check if we're on a 2FA page
             try:
-                two_factor_elements = driver.find_elements(By.XPATH, 
-                    "//*[contains(text(), 'verification') or contains(text(), 'Duo') or " +
-                    "contains(text(), 'two-factor') or contains(text(), 'security code') or " +
-                    "contains(text(), 'authentication') or contains(text(), '2FA')]")
-                
-                if two_factor_elements and len(two_factor_elements) > 0:
+                if status.state == PageState.TWO_FACTOR:
                     print("🔐 2FA verification required even with cookies. This is normal for security.")
                     print("Please complete the 2FA verification when prompted.")
-                    driver.save_screenshot("cookie_login_2fa.png")
+                    capture(driver, "cookie_login_2fa")
                     
                     # Wait for user to complete 2FA
-                    input("🔐 Press Enter ONLY AFTER you have completed 2FA verification...")
-                    
-                    # Check login status again after 2FA
-                    if check_login_status(driver):
+                    if wait_for_user(driver, "🔐 Press Enter ONLY AFTER you have completed 2FA verification...") \
+                            and check_login_status(driver):
                         print("✅ Successfully logged in after completing 2FA!")
                         # Update cookies since they now include post-2FA state
-                        pickle.dump(driver.get_cookies(), open(COOKIE_FILE, "wb"))
+                        save_session(driver)
                         print("✅ Updated cookies saved for future use.")
                         return True
             except Exception as e:
                 print(f"ℹ️ 2FA check during cookie login: {e}")
             
             print("❌ Cookie login failed. You'll need to log in manually.")
+            get_session_store().invalidate(run_context.user, MYSLICE_SESSION_DOMAIN)
             return False
     except Exception as e:
         print(f"❌ Error loading cookies: {e}")
-        # If there's any error with cookies, delete the file and force fresh login
+        # If there's any error with cookies, drop the stored session and force fresh login
         try:
-            os.remove(COOKIE_FILE)
-            print("⚠️ Invalid cookies detected. Cookie file deleted. Manual login required.")
+            get_session_store().invalidate(run_context.user, MYSLICE_SESSION_DOMAIN)
+            print("⚠️ Invalid cookies detected. Saved session dropped. Manual login required.")
         except:
             pass
         return False
 
-def check_login_status(driver):
-    """Check if user is logged in to MySlice"""
-    try:
-        # Look for elements that would indicate successful login
-        WebDriverWait(driver, 5).until(
-            EC.presence_of_element_located((By.ID, "ptifrmtgtframe")) or
-            EC.presence_of_element_located((By.ID, "pthdr2container"))
-        )
+def check_login_status(driver, status=None):
+    """Check if user is logged in to MySlice, classifying the page unless status is given"""
+    if status is None:
+        status = wait_for_page_state(driver, "login_status")
+    if status.state in LOGGED_IN_STATES:
         return True
-    except:
-        try:
-            # Check if login form is still present
-            WebDriverWait(driver, 2).until(
-                EC.presence_of_element_located((By.ID, "userid")) or
-                EC.presence_of_element_located((By.ID, "login"))
-            )
-            return False
-        except:
-            # Not sure, take a screenshot and return status based on current URL
-            driver.save_screenshot("login_check.png")
-            return "myslice.ps.syr.edu" in driver.current_url and "login" not in driver.current_url
+    if status.state == PageState.UNKNOWN:
+        # Not sure, take a screenshot and return status based on current URL
+        capture(driver, "login_check", error=True)
+        return "myslice.ps.syr.edu" in driver.current_url and "login" not in driver.current_url
+    return False
 
 def check_for_peoplesoft_error(driver):
-    """Check for common PeopleSoft error messages"""
-    error_messages = [
-        "An error has occurred that has stopped this transaction from continuing",
-        "Your session has timed out",
-        "Session expired",
-        "Invalid session",
-        "Please log in again"
-    ]
-    
-    for error_msg in error_messages:
-        try:
-            if error_msg in driver.page_source:
-                print(f"⚠️ PeopleSoft error detected: {error_msg}")
-                driver.save_screenshot(f"peoplesoft_error_{int(time.time())}.png")
-                return True
-        except:
-            pass
+    """Check for PeopleSoft error and session-timeout pages in a single pass"""
+    try:
+        status = classify_driver(driver)
+    except Exception:
+        return False
+    if status.state in FAILURE_STATES:
+        print(f"⚠️ PeopleSoft error detected: {status.detail}")
+        capture(driver, f"peoplesoft_error_{int(time.time())}", error=True)
+        return True
     return False
 
 def handle_session_timeout(driver):
@@ -247,24 +742,24 @@ def handle_session_timeout(driver):
     try:
         # Try to refresh the page first
         driver.refresh()
-        time.sleep(3)
+        status = wait_for_page_state(driver, "timeout_refresh")
         
         # Check if we're back to the login page
-        if "login" in driver.current_url.lower():
+        if status.state == PageState.LOGIN:
             print("🔐 Session timeout detected. Please log in again...")
             return prepare_login(driver)
         
         # Check if we're on a SAML page
-        if "saml" in driver.current_url.lower():
+        if status.state == PageState.SAML:
             print("🔐 SAML authentication required. Please complete the login process...")
-            input("Press Enter AFTER you have completed the SAML login and 2FA...")
-            return True
+            return wait_for_user(driver, "Press Enter AFTER you have completed the SAML login and 2FA...")
             
         # If we're still on an error page, try going back to the main page
-        if check_for_peoplesoft_error(driver):
+        if status.state in FAILURE_STATES:
+            print(f"⚠️ PeopleSoft error persists after refresh: {status.detail}")
             print("🔄 Navigating back to main page...")
             driver.get(LOGIN_URL)
-            time.sleep(3)
+            timed_wait(driver, "timeout_login_page", page_loaded)
             return prepare_login(driver)
             
         return True
@@ -272,6 +767,7 @@ def handle_session_timeout(driver):
         print(f"❌ Error handling session timeout: {e}")
         return False
 
+@traced("navigation")
 def navigate_to_course_history(driver):
     """Navigate to Course History page via the Academics tile flow"""
     print("\n🔍 Navigating to Course History via the Academics tile...")
@@ -279,7 +775,9 @@ def navigate_to_course_history(driver):
     try:
         # Ensure we are on the main MySlice page after login
         print("🔍 Ensuring we are on the MySlice dashboard...")
-        time.sleep(5)  # Wait for dashboard to fully load
+        # Wait for dashboard to fully load
+        timed_wait(driver, "dashboard_ready",
+                   lambda d: peoplesoft_idle(d) and any_element_present(d, DASHBOARD_MARKER_IDS))
 
         # Check for any PeopleSoft errors
         if check_for_peoplesoft_error(driver):
@@ -287,7 +785,7 @@ def navigate_to_course_history(driver):
                 return False
 
         # Take a screenshot of the current state
-        driver.save_screenshot("before_navigation.png")
+        capture(driver, "before_navigation")
         
         # 1. Find and click 'Academics' tile
         print("🔍 Looking for 'Academics' tile...")
@@ -298,13 +796,14 @@ def navigate_to_course_history(driver):
             )
             print("✅ Found 'Academics' tile, clicking...")
             try:
-                driver.execute_script("arguments[0].scrollIntoView(true);", academics_tile)
-                time.sleep(1)
+                scroll_into_view(driver, academics_tile)
                 driver.execute_script("arguments[0].click();", academics_tile)
             except Exception as click_err:
                 print(f"ℹ️ JavaScript click failed ({click_err}), trying regular click...")
                 academics_tile.click()
-            time.sleep(8) # Increased wait time after clicking Academics
+            # Wait for the Academics page to finish loading its step list
+            timed_wait(driver, "academics_loaded",
+                       lambda d: peoplesoft_idle(d) and any_element_present(d, [COURSE_HISTORY_LINK_ID]))
             
             # Check for errors after clicking
             if check_for_peoplesoft_error(driver):
@@ -312,17 +811,17 @@ def navigate_to_course_history(driver):
                     return False
         except Exception as e:
             print(f"❌ Error clicking 'Academics' tile: {e}")
-            driver.save_screenshot("academics_click_error.png")
+            capture(driver, "academics_click_error", error=True)
             return False
 
         # Take screenshot after clicking Academics
-        driver.save_screenshot("after_academics_click.png")
-        print("📸 Saved screenshot after clicking 'Academics'")
+        capture(driver, "after_academics_click")
+        print("📸 Captured state after clicking 'Academics'")
 
         # 2. Find and click 'Course History' link (potentially in a sidebar)
         print("🔍 Looking for 'Course History' link (potentially in a sidebar)...")
         try:
-            course_history_link_id = "win9divPTGP_STEP_DVW_PTGP_STEP_BTN_GB$1"
+            course_history_link_id = COURSE_HISTORY_LINK_ID
             print(f"   Waiting up to 20 seconds for Course History link (ID: {course_history_link_id}) to be PRESENT in the DOM...")
             # First, wait for the element to exist in the DOM, even if not visible/clickable yet
             WebDriverWait(driver, 20).until(
@@ -338,13 +837,13 @@ def navigate_to_course_history(driver):
             print("✅ Found 'Course History' link and it's clickable, proceeding to click...")
             try:
                 # Try scrolling into view first, as it might be off-screen in the sidebar
-                driver.execute_script("arguments[0].scrollIntoView(true);", course_history_link)
-                time.sleep(1)
+                scroll_into_view(driver, course_history_link)
                 driver.execute_script("arguments[0].click();", course_history_link)
             except Exception as click_err:
                 print(f"ℹ️ JavaScript click failed ({click_err}), trying regular click...")
                 course_history_link.click()
-            time.sleep(5)
+            timed_wait(driver, "course_history_loaded",
+                       lambda d: peoplesoft_idle(d) and d.execute_script(COURSE_HISTORY_FRAME_SCRIPT))
             
             # Check for errors after clicking
             if check_for_peoplesoft_error(driver):
@@ -352,34 +851,139 @@ def navigate_to_course_history(driver):
                     return False
         except Exception as e:
             print(f"❌ Error clicking 'Course History' link: {e}")
-            driver.save_screenshot("course_history_click_error.png")
+            capture(driver, "course_history_click_error", error=True)
             return False
 
         # Take a final screenshot before scraping starts
-        driver.save_screenshot("course_history_ready.png")
-        print("📸 Saved screenshot of Course History page, ready to scrape")
+        capture(driver, "course_history_ready")
+        print("📸 Captured Course History page, ready to scrape")
 
         return True
     except Exception as e:
         print(f"❌ Error during navigation: {e}")
-        driver.save_screenshot("navigation_error.png")
+        capture(driver, "navigation_error", error=True)
         return False
 
-def scrape_completed_courses(driver):
-    """Scrape completed courses from within the main content iframe."""
+# Selector patterns for the fields that share a CRSE_NAME$n row's suffix.
+# Ids are matched exactly: a prefix match on "...$1" would also hit "...$10".
+# --- These selectors are common patterns, adjust if needed ---
+GRADE_SELECTORS = ['span[id="GRADE_TBL_GRADE_INPUT${suffix}"]', 'span[id="CRSE_GRADE_OFF${suffix}"]']
+CREDITS_SELECTORS = ['span[id="STDNT_ENRL_UNITS_TAKEN${suffix}"]', 'span[id="UNITS_TAKEN${suffix}"]']
+TERM_SELECTORS = ['span[id="TERM_TBL_DESCR${suffix}"]']
+# --- End of selector patterns ---
+
+# Reads every course row's fields in one round trip. Mirrors the per-element
+# lookup: the first selector that matches wins and a miss becomes 'Unknown'.
+# Rows of skipped (already final) terms are dropped after reading only the term.
+BULK_EXTRACT_SCRIPT = """
+const [nameSelector, gradeSelectors, creditsSelectors, termSelectors, skipTerms] = arguments;
+const skip = new Set(skipTerms || []);
+const textOf = (el) => (el.innerText || el.textContent || '').trim();
+const firstText = (selectors, suffix) => {
+    for (const selector of selectors) {
+        const el = document.querySelector(selector.split('{suffix}').join(suffix));
+        if (el) return textOf(el);
+    }
+    return 'Unknown';
+};
+return Array.from(document.querySelectorAll(nameSelector)).map((nameEl) => {
+    const suffix = nameEl.id.split('$').pop();
+    const term = firstText(termSelectors, suffix);
+    if (skip.has(term)) return null;
+    return {
+        id: nameEl.id,
+        course_code_name: textOf(nameEl),
+        grade: firstText(gradeSelectors, suffix),
+        credits: firstText(creditsSelectors, suffix),
+        term: term,
+    };
+}).filter((row) => row !== null);
+"""
+
+def extract_course_rows_bulk(driver, course_name_selector, skip_terms=()):
+    """Collect every course row with a single execute_script call, or None if that fails"""
+    try:
+        with span("extract_rows_bulk"):
+            rows = driver.execute_script(BULK_EXTRACT_SCRIPT, course_name_selector,
+                                         GRADE_SELECTORS, CREDITS_SELECTORS, TERM_SELECTORS, sorted(skip_terms))
+    except Exception as e:
+        print(f"ℹ️ Bulk extraction failed ({e}), falling back to per-element extraction...")
+        return None
+    if not isinstance(rows, list):
+        print("ℹ️ Bulk extraction returned no rows, falling back to per-element extraction...")
+        return None
+    print(f"✅ Bulk-extracted {len(rows)} course rows in one call.")
+    courses = []
+    for row in rows:
+        courses.append(build_course_info(row['course_code_name'], row['grade'], row['credits'], row['term']))
+        emit_course(courses[-1])
+    return courses
+
+def extract_course_rows_per_element(driver, course_name_selector, skip_terms=()):
+    """Collect course rows with one WebDriver lookup per field (slow fallback path)"""
+    rows = []
+    course_name_elements = driver.find_elements(By.CSS_SELECTOR, course_name_selector)
+    print(f"ℹ️ Found {len(course_name_elements)} potential course name elements.")
+
+    # Helper function to find element text using a list of selectors
+    def find_element_text(selectors, suffix):
+        for selector in selectors:
+            # find_elements returns [] on a miss instead of raising
+            elements = driver.find_elements(By.CSS_SELECTOR, selector.replace('{suffix}', suffix))
+            if elements:
+                return elements[0].text.strip()
+        return 'Unknown' # Not found with any selector
+
+    for i, course_name_element in enumerate(course_name_elements):
+        course_name_id = None
+        try:
+            # Extract course name and ID suffix
+            course_name_id = course_name_element.get_attribute('id')
+            suffix = course_name_id.split('$')[-1] # Get the numerical index like '0', '1', etc.
+            with span("extract_row"):
+                term = find_element_text(TERM_SELECTORS, suffix)
+                if term in skip_terms:
+                    continue # Term already final in the stored record
+                rows.append(build_course_info(
+                    course_name_element.text.strip(),
+                    find_element_text(GRADE_SELECTORS, suffix),
+                    find_element_text(CREDITS_SELECTORS, suffix),
+                    term,
+                ))
+            emit_course(rows[-1])
+
+            # Screenshot for debugging every 10 courses
+            if (i + 1) % 10 == 0:
+                capture(driver, f"scraping_course_{i+1}_in_iframe")
+
+        except Exception as e:
+            print(f"⚠️ Error processing potential course element {i} (ID: {course_name_id}): {e}")
+            capture(driver, f"scraping_error_element_{i}", error=True)
+            continue # Skip to next course name element
+    return rows
+
+@traced("scrape_courses")
+def scrape_completed_courses(driver, bulk=True, skip_terms=()):
+    """Scrape completed courses from within the main content iframe.
+
+    By default every row is read in a single in-browser call; the
+    per-element WebDriver path is only used when that fails or bulk=False.
+    Rows of skip_terms are left out after reading only their term.
+    """
     courses = []
-    seen_courses = set()  # To avoid duplicates
     iframe_id = "ptifrmtgtframe" # Common ID for PeopleSoft content iframe
 
     try:
         # 1. Switch to the iframe
         print(f"\n🔍 Switching to iframe: {iframe_id}")
-        WebDriverWait(driver, 15).until(
-            EC.frame_to_be_available_and_switch_to_it((By.ID, iframe_id))
-        )
+        with span("frame_switch"):
+            WebDriverWait(driver, 15).until(
+                EC.frame_to_be_available_and_switch_to_it((By.ID, iframe_id))
+            )
         print(f"✅ Switched to iframe: {iframe_id}")
-        time.sleep(2) # Allow content within iframe to load
-        driver.save_screenshot("iframe_content.png")
+        # Allow content within iframe to load
+        timed_wait(driver, "iframe_loaded", peoplesoft_idle)
+        capture(driver, "iframe_content")
 
         # 2. Wait for course elements within the iframe
         course_name_selector = 'span[id^="CRSE_NAME$"]'
@@ -388,84 +992,26 @@ def scrape_completed_courses(driver):
             EC.presence_of_element_located((By.CSS_SELECTOR, course_name_selector))
         )
         print("✅ Found course name elements within iframe.")
-        
-        # 3. Get all course name elements
-        course_name_elements = driver.find_elements(By.CSS_SELECTOR, course_name_selector)
-        print(f"ℹ️ Found {len(course_name_elements)} potential course name elements.")
-        
-        # 4. Iterate through elements and extract data
-        for i, course_name_element in enumerate(course_name_elements):
-            course_info = {}
-            try:
-                # Extract course name and ID suffix
-                course_name_id = course_name_element.get_attribute('id')
-                suffix = course_name_id.split('$')[-1] # Get the numerical index like '0', '1', etc.
-                course_info['course_code_name'] = course_name_element.text.strip()
-
-                # Construct potential IDs for related fields using the suffix
-                # --- These selectors are common patterns, adjust if needed --- 
-                grade_selectors = [
-                    f'span[id^="GRADE_TBL_GRADE_INPUT${suffix}"]',
-                    f'span[id^="CRSE_GRADE_OFF${suffix}"]'
-                ]
-                credits_selectors = [
-                    f'span[id^="STDNT_ENRL_UNITS_TAKEN${suffix}"]',
-                    f'span[id^="UNITS_TAKEN${suffix}"]'
-                ]
-                term_selectors = [
-                    f'span[id^="TERM_TBL_DESCR${suffix}"]'
-                ]
-                # --- End of selector patterns --- 
-
-                # Helper function to find element text using a list of selectors
-                def find_element_text(selectors):
-                    for selector in selectors:
-                        try:
-                            element = driver.find_element(By.CSS_SELECTOR, selector)
-                            return element.text.strip()
-                        except:
-                            continue # Try next selector
-                    return 'Unknown' # Not found with any selector
-
-                # Extract Grade, Credits, Term
-                course_info['grade'] = find_element_text(grade_selectors)
-                course_info['credits'] = find_element_text(credits_selectors)
-                course_info['term'] = find_element_text(term_selectors)
-                
-                # Basic parsing of course code (assuming format like 'SUBJ 123')
-                match = re.match(r"([A-Za-z]+)\s*(\d+)", course_info['course_code_name'])
-                if match:
-                    course_info['course_code'] = f"{match.group(1)} {match.group(2)}"
-                    course_info['course_name'] = course_info['course_code_name'] # Keep full name for now
-                else:
-                    course_info['course_code'] = course_info['course_code_name'] # Fallback
-                    course_info['course_name'] = course_info['course_code_name']
-
-                # Only add if we have a course code and haven't seen it before
-                course_identifier = course_info['course_code'] + '_' + course_info['term'] # Use code+term as unique ID
-                if course_info['course_code'] and course_identifier not in seen_courses:
-                    print(f"  -> Scraping: {course_info}")
-                    courses.append(course_info)
-                    seen_courses.add(course_identifier)
-                    
-                # Screenshot for debugging every 10 courses
-                if (i + 1) % 10 == 0:
-                    driver.save_screenshot(f"scraping_course_{i+1}_in_iframe.png")
-                    
-            except Exception as e:
-                print(f"⚠️ Error processing potential course element {i} (ID: {course_name_id}): {e}")
-                driver.save_screenshot(f"scraping_error_element_{i}.png")
-                continue # Skip to next course name element
-                
+
+        # 3. Extract every row, in one round trip when possible
+        rows = extract_course_rows_bulk(driver, course_name_selector, skip_terms) if bulk else None
+        if rows is None:
+            rows = extract_course_rows_per_element(driver, course_name_selector, skip_terms)
+
+        # 4. Keep the first occurrence of each course (code+term as unique ID)
+        courses = unique_courses(rows)
+        for course_info in courses:
+            print(f"  -> Scraping: {course_info}")
+
     except TimeoutException:
         print(f"❌ Timeout waiting for iframe '{iframe_id}' or course elements within it.")
-        driver.save_screenshot("iframe_timeout_error.png")
+        capture(driver, "iframe_timeout_error", error=True)
     except NoSuchFrameException:
         print(f"❌ Iframe with ID '{iframe_id}' not found.")
-        driver.save_screenshot("iframe_not_found_error.png")
+        capture(driver, "iframe_not_found_error", error=True)
     except Exception as e:
         print(f"❌ An unexpected error occurred during scraping: {e}")
-        driver.save_screenshot("scraping_unexpected_error.png")
+        capture(driver, "scraping_unexpected_error", error=True)
     finally:
         # 5. Switch back to the default content IMPORTANT!
         try:
@@ -476,55 +1022,172 @@ def scrape_completed_courses(driver):
             
     # Save results (even if partial)
     print(f"\n✅ Scraping finished. Found {len(courses)} unique courses.")
-    with open("scraped_courses_output.json", "w") as f:
-        json.dump(courses, f, indent=2)
-        print("💾 Scraped data saved to scraped_courses_output.json")
+    save_courses(courses, "scraped_courses_output.json")
+    print("💾 Scraped data saved to scraped_courses_output.json")
         
     return courses
 
-def scrape_user_courses(interactive=True, username=None, password=None):
-    """Main function to scrape user's completed courses"""
+def record_scrape(history, rows, skipped_terms):
+    """Merge extracted rows into the student's stored record; return all courses and the delta"""
+    delta = merge_rows(history, rows, skipped_terms)
+    save_history(history)
+    print(f"🧮 {len(delta['added'])} new, {len(delta['changed'])} changed, {len(delta['removed'])} removed rows "
+          f"({len(skipped_terms)} finished terms skipped)")
+    return history_courses(history), delta
+
+def scrape_user_courses(interactive=True, username=None, password=None, fast_path=True, browser_pool=None, lean=False,
+                        incremental=True, on_course=None, views=EXTRA_VIEWS):
+    """Main function to scrape user's completed courses.
+
+    With fast_path, saved cookies are first tried over plain HTTP; Chrome
+    is only started when there are none or the session is rejected. When
+    browser_pool is given, a warm browser is leased from it and returned
+    afterwards instead of launching and quitting one; otherwise lean picks
+    the lean browser profile for the browser started here. With
+    SCRAPER_SPANS=1 every phase is timed into scrape_metrics.SPANS_FILE.
+
+    With incremental, terms the student's stored record already holds as
+    final are not read again; the rest is merged into that record and the
+    result's "changes" lists the added, changed and removed rows.
+
+    on_course, if given, is called with every course as soon as it is
+    known, starting with the stored rows of skipped terms, so a consumer
+    can show results before the scrape finishes.
+
+    views names extra PeopleSoft views (see PEOPLESOFT_VIEWS) to fetch in
+    the same session, concurrently with Course History: as parallel HTTP
+    requests on the fast path, in background tabs in the browser (views in
+    MAIN_COMPONENT_VIEWS are opened only after Course History is scraped).
+    Their parsed results are returned under "views". By default these are
+    the RECORD_VIEWS; SCRAPER_EXTRA_VIEWS overrides the list.
+    """
+    unknown = [name for name in views if name not in PEOPLESOFT_VIEWS]
+    if unknown:
+        raise ValueError(f"Unknown views {unknown}, expected some of {', '.join(PEOPLESOFT_VIEWS)}")
+    start_run(interactive=interactive, pooled=browser_pool is not None, lean=lean)
+    run_context.diagnostics.discard()
+    previous = (run_context.user, run_context.course_sink, run_context.emitted, run_context.interactive)
+    run_context.user = username or previous[0]
+    run_context.course_sink = on_course
+    run_context.emitted = set()
+    run_context.interactive = interactive
+    run_context.login_required = False
+    result = None
+    try:
+        result = _scrape_user_courses(interactive, username, password, fast_path, browser_pool, lean, incremental,
+                                      views)
+        return result
+    finally:
+        run_context.user, run_context.course_sink, run_context.emitted, run_context.interactive = previous
+        success = bool(result and result.get("success"))
+        run_id = finish_run("success" if success else "failure")
+        if run_id and result is not None:
+            result["span_run_id"] = run_id
+        if success:
+            run_context.diagnostics.discard()
+        else:
+            # Only failed runs pay for writing captures, and on a background thread
+            directory = run_path(os.path.join("diagnostics", time.strftime("%Y%m%d-%H%M%S")))
+            if run_context.diagnostics.flush(directory):
+                print(f"📸 Writing failure diagnostics to {directory}")
+                if result is not None:
+                    result["diagnostics_dir"] = directory
+
+def login_required_result():
+    return {
+        "success": False,
+        "code": "login_required",
+        "message": "A manual login (SAML or 2FA) is required; run the scraper interactively to refresh the session.",
+    }
+
+def _scrape_user_courses(interactive, username, password, fast_path, browser_pool, lean, incremental, views):
+    output_file = "user_completed_courses.json"
+    history = load_history(run_context.user)
+    skip_terms = frozen_terms(history) if incremental else set()
+    # Rows of finished terms are already known, so consumers get them first
+    for course in history_courses(history):
+        if course['term'] in skip_terms:
+            emit_course(course)
+    if fast_path:
+        fetched = fetch_course_history_http(skip_terms, views)
+        if fetched is not None:
+            scraped_courses, view_results = fetched
+            save_courses(scraped_courses, "scraped_courses_output.json")
+            completed_courses, changes = record_scrape(history, scraped_courses, skip_terms)
+            save_courses(completed_courses, output_file)
+            print(f"\n💾 Saved {len(completed_courses)} courses to {output_file}")
+            return {
+                "success": True,
+                "message": f"Successfully scraped {len(completed_courses)} courses.",
+                "courses": completed_courses,
+                "changes": changes,
+                "views": view_results,
+                "source": "http",
+            }
+
     driver = None
+    run_context.wait_timings.clear()
+    run_context.page_metrics.clear()
     try:
-        driver = setup_driver(headless=not interactive)
+        if browser_pool is not None:
+            with span("driver_lease"):
+                driver = browser_pool.acquire()
+        else:
+            driver = setup_driver(headless=not interactive, lean=lean)
         
         # Try to login with cookies first
         if not login_with_cookies(driver):
             # If cookie login fails, try with provided credentials
             if not prepare_login(driver, username, password):
                 print("❌ Login failed. Exiting...")
+                if not interactive:
+                    return login_required_result()
                 return None
         
+        # Other views load in background tabs while this one navigates
+        view_tabs = open_view_tabs(driver, [name for name in views if name not in MAIN_COMPONENT_VIEWS])
+
         # Navigate to Course History page using menu clicks
         if navigate_to_course_history(driver):
             print("📚 Ready to scrape your academic record...")
             
-            # Scrape completed courses
-            completed_courses = scrape_completed_courses(driver)
+            # Scrape completed courses, skipping terms that are already final
+            scraped_courses = scrape_completed_courses(driver, skip_terms=skip_terms)
+            # Views sharing the main tab's component wait until it is done with it
+            view_tabs.update(open_view_tabs(driver, [name for name in views if name in MAIN_COMPONENT_VIEWS]))
+            view_results = collect_view_tabs(driver, view_tabs)
+            completed_courses, changes = record_scrape(history, scraped_courses, skip_terms)
             
             # Save to JSON file
-            output_file = "user_completed_courses.json"
-            with open(output_file, "w") as f:
-                json.dump(completed_courses, f, indent=2)
+            save_courses(completed_courses, output_file)
             
             print(f"\n💾 Saved {len(completed_courses)} courses to {output_file}")
             return {
                 "success": True,
                 "message": f"Successfully scraped {len(completed_courses)} courses.",
-                "courses": completed_courses
+                "courses": completed_courses,
+                "changes": changes,
+                "views": view_results,
+                "source": "browser",
+                "wait_timings": list(run_context.wait_timings),
+                "page_metrics": list(run_context.page_metrics)
             }
         else:
             print("❌ Failed to navigate to Course History page.")
-            driver.save_screenshot("navigation_failure.png")
+            capture(driver, "navigation_failure", error=True)
+            if run_context.login_required:
+                return login_required_result()
             return {
                 "success": False,
-                "message": "Failed to navigate to Course History page. Please check screenshots for issues."
+                "message": "Failed to navigate to Course History page. Please check screenshots for issues.",
+                "wait_timings": list(run_context.wait_timings),
+                "page_metrics": list(run_context.page_metrics)
             }
     
     except Exception as e:
         print(f"❌ Error: {e}")
         try:
-            driver.save_screenshot("error_state.png")
+            capture(driver, "error_state", error=True)
         except:
             pass
             
@@ -533,24 +1196,63 @@ def scrape_user_courses(interactive=True, username=None, password=None):
             "message": f"An error occurred: {str(e)}"
         }
     finally:
+        report_wait_timings()
+        report_page_metrics()
+
         # Take a final screenshot before closing
         try:
-            driver.save_screenshot("myslice_final_state.png")
-            print("📸 Saved final screenshot for reference")
+            capture(driver, "myslice_final_state")
+            print("📸 Captured final state for reference")
         except:
             pass
             
-        if interactive:
-            input("\nPress Enter to close the browser and exit...")
-        driver.quit()
-        print("✅ Browser closed. Scraping complete.")
+        if driver is not None and browser_pool is not None:
+            browser_pool.release(driver)
+            print("✅ Browser returned to the pool. Scraping complete.")
+        elif driver is not None:
+            if interactive:
+                input("\nPress Enter to close the browser and exit...")
+            driver.quit()
+            print("✅ Browser closed. Scraping complete.")
 
 def run_scraper_backend():
     """Function to be called from backend API - non-interactive mode"""
+    # One-shot: a browser only starts if the HTTP fast path is rejected, and
+    # it is quit afterwards; long-lived callers lease from the pool via ScrapeService
     return scrape_user_courses(interactive=False)
 
+def compare_lean_profile(username=None, password=None):
+    """Run the browser flow with the default and the lean profile and compare each step"""
+    runs = {}
+    for lean in (False, True):
+        print(f"\n===== Browser flow with {'lean' if lean else 'default'} profile =====")
+        result = scrape_user_courses(interactive=True, username=username, password=password,
+                                     fast_path=False, lean=lean) or {}
+        runs[lean] = {m["step"]: m for m in result.get("page_metrics", [])}
+
+    print(f"\n{'Step':<24} {'Default KiB':>12} {'Lean KiB':>10} {'Default ms':>11} {'Lean ms':>9}")
+    for step in PAGE_METRIC_STEPS:
+        default, lean = runs[False].get(step), runs[True].get(step)
+        if not default and not lean:
+            continue
+        cells = [f"{m['bytes'] / 1024:.1f}" if m else "-" for m in (default, lean)]
+        cells += [str(m["load_ms"]) if m else "-" for m in (default, lean)]
+        print(f"{step:<24} {cells[0]:>12} {cells[1]:>10} {cells[2]:>11} {cells[3]:>9}")
+    return runs
+
 if __name__ == "__main__":
     import sys
-    username = sys.argv[1] if len(sys.argv) > 1 else None
-    password = sys.argv[2] if len(sys.argv) > 2 else None
-    scrape_user_courses(interactive=True, username=username, password=password)
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    username = args[0] if len(args) > 0 else None
+    password = args[1] if len(args) > 1 else None
+    if "--compare-lean" in sys.argv:
+        compare_lean_profile(username=username, password=password)
+    elif "--ndjson" in sys.argv:
+        from course_stream import stdout_stream
+        with stdout_stream() as stream:
+            result = scrape_user_courses(interactive=True, username=username, password=password,
+                                         lean="--lean" in sys.argv, on_course=stream.course)
+            stream.summary(result)
+        sys.exit(0 if result and result.get("success") else 1)
+    else:
+        scrape_user_courses(interactive=True, username=username, password=password, lean="--lean" in sys.argv)
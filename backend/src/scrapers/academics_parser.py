@@ -0,0 +1,63 @@
+"""Browser-free extraction of the PeopleSoft Academics navigation collection.
+
+    python academics_parser.py "HTML text.html"
+
+ACADEMIC_PROGRESS_URL opens the Academics page, a fluid navigation
+collection whose steps (Academic Program, Course History, Grades,
+Transcript, ...) each link to one view of the student's record. The steps
+are step buttons carrying ptgpid/steplabel/href attributes, so one
+streaming pass over the page is enough.
+"""
+from html.parser import HTMLParser
+import argparse
+import json
+
+STEP_MARKER = "PTGP_STEP_DVW"
+STEP_BUTTON_CLASS = "ps_ag-step-button"
+
+
+class AcademicsStepParser(HTMLParser):
+    """Collects the navigation collection's step buttons in page order"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.steps = []
+        self._seen = set()
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if not attrs.get("ptgpid") or STEP_BUTTON_CLASS not in (attrs.get("class") or "").split():
+            return
+        if attrs["ptgpid"] in self._seen:
+            return
+        self._seen.add(attrs["ptgpid"])
+        self.steps.append({
+            "id": attrs["ptgpid"],
+            "label": attrs.get("steplabel") or attrs.get("steptitle") or attrs["ptgpid"],
+            "url": attrs.get("href"),
+            "selected": "psc_selected" in attrs["class"].split(),
+        })
+
+
+def parse_academics_html(html):
+    """Return the Academics steps as {id, label, url, selected} records"""
+    if isinstance(html, bytes):
+        html = html.decode("utf-8", errors="replace")
+    parser = AcademicsStepParser()
+    parser.feed(html)
+    parser.close()
+    return parser.steps
+
+
+def is_academics_page(html):
+    """True when the page contains the Academics navigation collection"""
+    return STEP_MARKER.encode() in html if isinstance(html, bytes) else STEP_MARKER in html
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="List the steps of saved Academics pages")
+    parser.add_argument("pages", nargs="+", help="saved Academics HTML files")
+    args = parser.parse_args()
+    for page in args.pages:
+        with open(page, "rb") as f:
+            print(json.dumps({page: parse_academics_html(f.read())}, indent=2))
@@ -0,0 +1,270 @@
+"""Offline benchmark for the catalog requirements parser.
+
+    python benchmark_catalog_parser.py record
+    python benchmark_catalog_parser.py run --source server --output bench.json
+    python benchmark_catalog_parser.py compare baseline.json bench.json
+
+`record` saves the live program pages as fixtures once; `run` replays them
+through the parser from disk or a local stand-in HTTP server and reports
+pages per second, per-phase time and peak memory; `compare` exits non-zero
+when a run is slower or larger than a baseline beyond the threshold. Only
+reports with the same source, parser and only_core setting are compared.
+"""
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+import ecs_requirements_scraper as scraper
+import statistics
+import tracemalloc
+import threading
+import argparse
+import json
+import time
+import sys
+import os
+
+DEFAULT_FIXTURE_DIR = os.path.join("app_data", "catalog_fixtures")
+MANIFEST_FILENAME = "manifest.json"
+PHASES = ["fetch", "parse", "section_walk", "categorize"]
+DEFAULT_THRESHOLD = 0.15
+# A phase median must also grow by this much to count, so sub-millisecond
+# phases (fetch from files) do not fail on noise
+DEFAULT_MIN_DELTA_MS = 0.5
+# Reports that differ in any of these measure different things
+REPORT_SETTINGS = ["source", "parser", "only_core"]
+
+
+def record_fixtures(fixture_dir=DEFAULT_FIXTURE_DIR, program_ids=None, catoid=scraper.CATALOG_ID):
+    """Download each program page once and save it with a manifest"""
+    program_ids = scraper.PROGRAM_IDS if program_ids is None else program_ids
+    os.makedirs(fixture_dir, exist_ok=True)
+    session = scraper.get_session(scraper.BASE_URL)
+    programs = {}
+    for program_name, poid in program_ids.items():
+        print(f"Recording {program_name}...")
+        response = scraper.fetch_page(scraper.PROGRAM_URL.format(catoid=catoid, poid=poid), session=session)
+        with open(os.path.join(fixture_dir, f"{poid}.html"), "wb") as f:
+            f.write(response.content)
+        programs[program_name] = poid
+    manifest = {"catoid": catoid, "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"), "programs": programs}
+    scraper.write_json(os.path.join(fixture_dir, MANIFEST_FILENAME), manifest)
+    print(f"Recorded {len(programs)} pages to {fixture_dir}")
+    return manifest
+
+
+def load_manifest(fixture_dir):
+    with open(os.path.join(fixture_dir, MANIFEST_FILENAME), "r") as f:
+        return json.load(f)
+
+
+class FixtureServer:
+    """Local stand-in for the catalog that serves preview_program.php from fixtures"""
+
+    def __init__(self, fixture_dir):
+        fixture_dir = os.path.abspath(fixture_dir)
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                poid = parse_qs(urlsplit(self.path).query).get("poid", [""])[0]
+                path = os.path.join(fixture_dir, f"{os.path.basename(poid)}.html")
+                if not poid or not os.path.exists(path):
+                    self.send_error(404)
+                    return
+                with open(path, "rb") as f:
+                    body = f.read()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/preview_program.php?catoid={{catoid}}&poid={{poid}}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def run_pages(pages, fetch, parser, only_core):
+    """Run every page through fetch, parse, section walk and categorize, timing each phase"""
+    timings = {phase: [] for phase in PHASES}
+    for program_name, poid in pages:
+        start = time.perf_counter()
+        content = fetch(poid)
+        fetched = time.perf_counter()
+        soup = scraper.parse_catalog_page(content, parser=parser, only_core=only_core)
+        parsed = time.perf_counter()
+        acalog_divs = soup.find_all("div", class_="acalog-core")
+        sections = scraper.walk_sections(acalog_divs)
+        walked = time.perf_counter()
+        scraper.find_total_credits(acalog_divs)
+        scraper.categorize_sections(sections)
+        done = time.perf_counter()
+        timings["fetch"].append(fetched - start)
+        timings["parse"].append(parsed - fetched)
+        timings["section_walk"].append(walked - parsed)
+        timings["categorize"].append(done - walked)
+    return timings
+
+
+def run_benchmark(fixture_dir=DEFAULT_FIXTURE_DIR, source="files", iterations=3,
+                  parser=scraper.DEFAULT_PARSER, only_core=True):
+    """Replay the recorded fixtures and return a report dict"""
+    manifest = load_manifest(fixture_dir)
+    pages = list(manifest["programs"].items())
+    catoid = manifest["catoid"]
+
+    def run(fetch):
+        # One untimed warm-up pass, then the timed iterations
+        run_pages(pages, fetch, parser, only_core)
+        timings = {phase: [] for phase in PHASES}
+        start = time.perf_counter()
+        for _ in range(iterations):
+            for phase, values in run_pages(pages, fetch, parser, only_core).items():
+                timings[phase].extend(values)
+        elapsed = time.perf_counter() - start
+
+        # Peak memory is measured in a separate pass so tracing does not skew the timings
+        tracemalloc.start()
+        run_pages(pages, fetch, parser, only_core)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return timings, elapsed, peak
+
+    if source == "server":
+        with FixtureServer(fixture_dir) as server:
+            session = scraper.requests.Session()
+            url = server.base_url
+            timings, elapsed, peak = run(
+                lambda poid: session.get(url.format(catoid=catoid, poid=poid), timeout=scraper.REQUEST_TIMEOUT).content)
+            session.close()
+    else:
+        def read_fixture(poid):
+            with open(os.path.join(fixture_dir, f"{poid}.html"), "rb") as f:
+                return f.read()
+        timings, elapsed, peak = run(read_fixture)
+
+    page_count = len(pages) * iterations
+    return {
+        "source": source,
+        "parser": scraper.resolve_parser(parser),
+        "only_core": only_core,
+        "pages": page_count,
+        "pages_per_second": round(page_count / elapsed, 2) if elapsed else None,
+        "phases_ms": {
+            phase: {
+                "median": round(statistics.median(values) * 1000, 3),
+                "total": round(sum(values) * 1000, 3),
+            }
+            for phase, values in timings.items()
+        },
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def print_report(report):
+    print(f"Source: {report['source']}  Parser: {report['parser']}  Only acalog-core: {report['only_core']}")
+    print(f"Pages: {report['pages']}  Pages/s: {report['pages_per_second']}  Peak KiB: {report['peak_kib']}")
+    print(f"{'Phase':<14} {'Median ms':>10} {'Total ms':>10}")
+    for phase in PHASES:
+        stats = report["phases_ms"][phase]
+        print(f"{phase:<14} {stats['median']:>10.3f} {stats['total']:>10.3f}")
+
+
+def mismatched_settings(baseline, current):
+    """Return the report settings that differ between baseline and current"""
+    return [key for key in REPORT_SETTINGS if baseline.get(key) != current.get(key)]
+
+
+def compare_reports(baseline, current, threshold=DEFAULT_THRESHOLD, min_delta_ms=DEFAULT_MIN_DELTA_MS):
+    """Return the regressions of current against baseline beyond threshold.
+
+    Phase medians additionally have to grow by min_delta_ms. Raises
+    ValueError when the reports were run with different settings.
+    """
+    mismatched = mismatched_settings(baseline, current)
+    if mismatched:
+        raise ValueError("Reports differ in " + ", ".join(
+            f"{key} ({baseline.get(key)} vs {current.get(key)})" for key in mismatched))
+    checks = [("pages_per_second", baseline["pages_per_second"], current["pages_per_second"], False, 0),
+              ("peak_kib", baseline["peak_kib"], current["peak_kib"], True, 0)]
+    for phase in PHASES:
+        checks.append((f"{phase}.median_ms", baseline["phases_ms"][phase]["median"],
+                       current["phases_ms"][phase]["median"], True, min_delta_ms))
+
+    regressions = []
+    print(f"{'Metric':<24} {'Baseline':>12} {'Current':>12} {'Change':>8}")
+    for name, before, after, lower_is_better, floor in checks:
+        if not before:
+            continue
+        change = (after - before) / before
+        worse = change > threshold and after - before > floor if lower_is_better else change < -threshold
+        print(f"{name:<24} {before:>12.3f} {after:>12.3f} {change:>+8.1%}{'  REGRESSION' if worse else ''}")
+        if worse:
+            regressions.append(name)
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmark for the catalog requirements parser")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    record = subparsers.add_parser("record", help="save live program pages as fixtures")
+    record.add_argument("--fixtures", default=DEFAULT_FIXTURE_DIR)
+
+    run = subparsers.add_parser("run", help="replay fixtures through the parser")
+    run.add_argument("--fixtures", default=DEFAULT_FIXTURE_DIR)
+    run.add_argument("--source", choices=["files", "server"], default="files",
+                     help="read fixtures from disk or through a local stand-in server")
+    run.add_argument("--iterations", type=int, default=3)
+    run.add_argument("--parser", default=scraper.DEFAULT_PARSER)
+    run.add_argument("--full-page", action="store_true")
+    run.add_argument("--output", help="write the report as JSON for later comparison")
+
+    compare = subparsers.add_parser("compare", help="fail if a run regressed against a baseline")
+    compare.add_argument("baseline")
+    compare.add_argument("current")
+    compare.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                         help="allowed relative slowdown or growth before failing")
+    compare.add_argument("--min-delta-ms", type=float, default=DEFAULT_MIN_DELTA_MS,
+                         help="smallest phase median slowdown in ms that can fail")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.command == "record":
+        record_fixtures(args.fixtures)
+    elif args.command == "run":
+        report = run_benchmark(args.fixtures, source=args.source, iterations=args.iterations,
+                               parser=args.parser, only_core=not args.full_page)
+        print_report(report)
+        if args.output:
+            scraper.write_json(args.output, report)
+    else:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        with open(args.current, "r") as f:
+            current = json.load(f)
+        try:
+            regressions = compare_reports(baseline, current, threshold=args.threshold,
+                                          min_delta_ms=args.min_delta_ms)
+        except ValueError as e:
+            print(f"❌ Cannot compare: {e}")
+            sys.exit(2)
+        if regressions:
+            print(f"❌ Regressions: {', '.join(regressions)}")
+            sys.exit(1)
+        print("✅ No regressions")
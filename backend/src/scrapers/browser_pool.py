@@ -0,0 +1,228 @@
+from collections import deque
+from contextlib import contextmanager
+import statistics
+import threading
+import tempfile
+import shutil
+import queue
+import time
+
+# Lease wait percentiles are computed over this many most recent leases
+LEASE_WAIT_SAMPLES = 1000
+
+
+class PooledBrowser:
+    def __init__(self, driver, profile_dir):
+        self.driver = driver
+        self.profile_dir = profile_dir
+        self.uses = 0
+
+
+class BrowserPool:
+    """Long-lived pool of pre-launched browsers that scrapes lease and return.
+
+    factory(profile_dir) must start a WebDriver using that directory as its
+    Chrome profile, so every pooled browser has its own isolated profile.
+    A browser is health-checked before each lease. When returned, its
+    cookies, HTTP cache and the storage (localStorage, IndexedDB, ...) of
+    origins plus every origin its tabs were on are wiped and it is parked on
+    a fresh about:blank tab; if any of that fails it is recycled instead,
+    since the next lease may be another student's. It is also replaced after
+    max_uses leases or as soon as it stops responding.
+    """
+
+    def __init__(self, factory, size=2, max_uses=20, warm=True, origins=()):
+        self.factory = factory
+        self.size = size
+        self.max_uses = max_uses
+        self.origins = set(origins)
+        self._launchers = set()
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._leased = 0
+        self._created = 0
+        self._recycled = 0
+        self._leases = 0
+        self._lease_waits = deque(maxlen=LEASE_WAIT_SAMPLES)
+        self._closed = False
+        if warm:
+            self.warm()
+
+    def warm(self):
+        """Launch browsers in parallel until the pool holds size of them"""
+        threads = []
+        while self._reserve():
+            threads.append(self._start_launcher())
+        for thread in threads:
+            thread.join()
+
+    def _reserve(self):
+        # Count a browser before launching it so concurrent callers never exceed size
+        with self._lock:
+            if self._created - self._recycled >= self.size:
+                return False
+            self._created += 1
+            return True
+
+    def _start_launcher(self):
+        # Tracked so close() can wait for browsers that are still starting
+        thread = threading.Thread(target=self._add_browser, daemon=True)
+        with self._lock:
+            self._launchers.add(thread)
+        thread.start()
+        return thread
+
+    def _launch(self):
+        """Start a reserved browser with a fresh profile directory"""
+        profile_dir = tempfile.mkdtemp(prefix="myslice_profile_")
+        try:
+            driver = self.factory(profile_dir)
+        except Exception:
+            shutil.rmtree(profile_dir, ignore_errors=True)
+            with self._lock:
+                self._created -= 1
+            raise
+        return PooledBrowser(driver, profile_dir)
+
+    def _add_browser(self):
+        try:
+            self._idle.put(self._launch())
+        except Exception as e:
+            print(f"⚠️ Could not launch pooled browser: {e}")
+        finally:
+            with self._lock:
+                self._launchers.discard(threading.current_thread())
+
+    def _retire(self, browser):
+        try:
+            browser.driver.quit()
+        except Exception:
+            pass
+        shutil.rmtree(browser.profile_dir, ignore_errors=True)
+        with self._lock:
+            self._recycled += 1
+
+    @staticmethod
+    def _healthy(browser):
+        try:
+            return browser.driver.execute_script("return 1") == 1 and bool(browser.driver.window_handles)
+        except Exception:
+            return False
+
+    def acquire(self, timeout=None):
+        """Lease a healthy browser, waiting for one to be returned if all are busy"""
+        if self._closed:
+            raise RuntimeError("Browser pool is closed")
+        start = time.monotonic()
+        while True:
+            try:
+                browser = self._idle.get_nowait()
+            except queue.Empty:
+                if self._reserve():
+                    browser = self._launch()
+                else:
+                    remaining = None if timeout is None else timeout - (time.monotonic() - start)
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError("No pooled browser became available")
+                    try:
+                        # Wake up periodically in case a retired browser freed a slot
+                        browser = self._idle.get(timeout=1.0 if remaining is None else min(remaining, 1.0))
+                    except queue.Empty:
+                        continue
+            if self._healthy(browser):
+                break
+            print("♻️ Pooled browser failed its health check, replacing it...")
+            self._retire(browser)
+
+        wait = time.monotonic() - start
+        with self._lock:
+            self._leased += 1
+            self._leases += 1
+            self._lease_waits.append(wait)
+        browser.uses += 1
+        browser.driver._pooled_browser = browser
+        return browser.driver
+
+    def release(self, driver):
+        """Return a leased browser, resetting it or recycling it when worn out"""
+        browser = driver._pooled_browser
+        with self._lock:
+            self._leased -= 1
+        if self._closed or browser.uses >= self.max_uses or not self._healthy(browser):
+            self._retire(browser)
+            self._replace()
+            return
+        try:
+            self._reset(driver)
+        except Exception as e:
+            print(f"♻️ Could not wipe a returned browser ({e}), recycling it...")
+            self._retire(browser)
+            self._replace()
+            return
+        self._idle.put(browser)
+
+    def _reset(self, driver):
+        """Leave nothing of this user's session behind for the next lease"""
+        origins = set(self.origins)
+        tabs = list(driver.window_handles)
+        for handle in tabs:
+            driver.switch_to.window(handle)
+            origin = driver.execute_script("return window.location.origin")
+            if origin and origin.startswith("http"):
+                origins.add(origin)
+        # sessionStorage belongs to the tab, so only a new tab starts without it
+        driver.switch_to.new_window("tab")
+        for handle in tabs:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(driver.window_handles[0])
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+        for origin in sorted(origins):
+            driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+        driver.get("about:blank")
+
+    def _replace(self):
+        # Relaunch in the background so returning a browser never blocks on Chrome start-up
+        if not self._closed and self._reserve():
+            self._start_launcher()
+
+    @contextmanager
+    def lease(self, timeout=None):
+        driver = self.acquire(timeout=timeout)
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+    def stats(self):
+        with self._lock:
+            waits = sorted(self._lease_waits)
+            stats = {
+                "size": self.size,
+                "idle": self._idle.qsize(),
+                "leased": self._leased,
+                "leases": self._leases,
+                "launched": self._created,
+                "recycled": self._recycled,
+            }
+        if waits:
+            stats["lease_wait_ms"] = {
+                "p50": round(statistics.median(waits) * 1000, 1),
+                "p95": round(waits[min(len(waits) - 1, int(len(waits) * 0.95))] * 1000, 1),
+                "max": round(waits[-1] * 1000, 1),
+            }
+        return stats
+
+    def close(self):
+        self._closed = True
+        # Browsers still starting would otherwise be left running after close
+        with self._lock:
+            launchers = list(self._launchers)
+        for thread in launchers:
+            thread.join()
+        while True:
+            try:
+                self._retire(self._idle.get_nowait())
+            except queue.Empty:
+                break
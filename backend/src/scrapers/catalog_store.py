@@ -0,0 +1,111 @@
+import sqlite3
+import hashlib
+import threading
+import json
+import time
+import os
+
+DEFAULT_STORE_PATH = os.path.join("app_data", "catalog_store.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    hash TEXT PRIMARY KEY,
+    body TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS programs (
+    year TEXT NOT NULL,
+    program TEXT NOT NULL,
+    hash TEXT NOT NULL REFERENCES objects(hash),
+    PRIMARY KEY (year, program)
+);
+CREATE TABLE IF NOT EXISTS catalogs (
+    year TEXT PRIMARY KEY,
+    catoid TEXT NOT NULL,
+    scraped_at TEXT NOT NULL
+);
+"""
+
+
+def canonical_json(obj):
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+
+class CatalogStore:
+    """Versioned, content-addressed store of scraped catalog years.
+
+    Course lists and program records are stored once per distinct content
+    in the objects table, addressed by their SHA-256. A program record
+    refers to its category course lists by hash, so a program or course
+    list that is identical across catalog years costs nothing extra. The
+    programs table maps (year, program) to a record hash, making "program X
+    for year Y" a primary-key lookup.
+    """
+
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def _put(self, obj):
+        body = canonical_json(obj)
+        digest = hashlib.sha256(body.encode("utf-8")).hexdigest()
+        self._conn.execute("INSERT OR IGNORE INTO objects (hash, body) VALUES (?, ?)", (digest, body))
+        return digest
+
+    def _get(self, digest):
+        row = self._conn.execute("SELECT body FROM objects WHERE hash = ?", (digest,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_catalog(self, year, catoid, all_requirements):
+        """Store one catalog year's scrape, replacing that year's program list"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM programs WHERE year = ?", (year,))
+            for requirements in all_requirements:
+                record = {key: value for key, value in requirements.items() if key != "categories"}
+                # Categories are kept as ordered [name, hash] pairs
+                record["categories"] = [
+                    [category, self._put(courses)]
+                    for category, courses in requirements.get("categories", {}).items()
+                ]
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO programs (year, program, hash) VALUES (?, ?, ?)",
+                    (year, requirements.get("program"), self._put(record)),
+                )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO catalogs (year, catoid, scraped_at) VALUES (?, ?, ?)",
+                (year, catoid, time.strftime("%Y-%m-%dT%H:%M:%S%z")),
+            )
+
+    def load_program(self, year, program):
+        """Return the requirements record for program in catalog year, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT hash FROM programs WHERE year = ? AND program = ?", (year, program)
+            ).fetchone()
+            if row is None:
+                return None
+            record = self._get(row[0])
+            record["categories"] = {category: self._get(digest) for category, digest in record["categories"]}
+            return record
+
+    def load_catalog(self, year):
+        """Return every program of a catalog year in stored order"""
+        with self._lock:
+            programs = [row[0] for row in self._conn.execute(
+                "SELECT program FROM programs WHERE year = ? ORDER BY rowid", (year,))]
+        return [self.load_program(year, program) for program in programs]
+
+    def years(self):
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT year FROM catalogs ORDER BY year DESC")]
+
+    def stats(self):
+        with self._lock:
+            objects, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(body)), 0) FROM objects").fetchone()
+            refs = self._conn.execute("SELECT COUNT(*) FROM programs").fetchone()[0]
+        return {"objects": objects, "bytes": size, "program_refs": refs}
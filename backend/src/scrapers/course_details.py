@@ -0,0 +1,128 @@
+from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
+import copy
+import re
+
+COURSE_PAGE_URL = "https://courses.syracuse.edu/preview_course_nopop.php?catoid={catoid}&coid={coid}"
+DEFAULT_ENRICH_WORKERS = 8
+# Fields enrich_requirements adds to a course; name_source marks a name taken from the course page
+DETAIL_FIELDS = ("title", "credits", "prerequisites", "name_source")
+
+COURSE_CODE_RE = re.compile(r'([A-Z]{2,4}\s\d{3}[A-Z]?)')
+# Course links carry their ids either in a preview_course href or a showCourse() onclick
+HREF_IDS_RE = re.compile(r"preview_course[^?]*\?(?=.*\bcatoid=(\d+))(?=.*\bcoid=(\d+))")
+ONCLICK_IDS_RE = re.compile(r"showCourse\(\s*'(\d+)'\s*,\s*'(\d+)'")
+CREDITS_RE = re.compile(r"Credit\(s\)\s*:?\s*(\d+(?:\.\d+)?(?:\s*-\s*\d+(?:\.\d+)?)?)", re.I)
+PREREQ_RE = re.compile(r"PREREQ(?:UISITES?)?\s*:?\s*(.+?)(?=\s*(?:COREQ|Typically Offered|Credit\(s\)|Restriction|$))",
+                       re.I | re.S)
+
+
+def course_page_url(link):
+    """Return the course page URL for a course link tag, or None"""
+    match = HREF_IDS_RE.search(link.get("href") or "")
+    if match:
+        return COURSE_PAGE_URL.format(catoid=match.group(1), coid=match.group(2))
+    match = ONCLICK_IDS_RE.search(link.get("onclick") or "")
+    if match:
+        return COURSE_PAGE_URL.format(catoid=match.group(1), coid=match.group(2))
+    return None
+
+
+def find_course_refs(soup):
+    """Map each linked course code on a program page to its course page URL"""
+    refs = {}
+    for div in soup.find_all("div", class_="acalog-core"):
+        for link in div.find_all("a"):
+            code_match = COURSE_CODE_RE.search(link.get_text(strip=True))
+            if not code_match or code_match.group(1) in refs:
+                continue
+            url = course_page_url(link)
+            if url:
+                refs[code_match.group(1)] = url
+    return refs
+
+
+def parse_course_page(content, parser="html.parser"):
+    """Pull the full title, credits and prerequisites out of a course page"""
+    soup = BeautifulSoup(content, parser)
+    heading = soup.find(id="course_preview_title") or soup.find("h1")
+    container = heading.find_parent("td") if heading else None
+    text = (container or soup).get_text(" ", strip=True)
+    text = re.sub(r"\s+", " ", text)
+
+    title = None
+    if heading:
+        heading_text = re.sub(r"\s+", " ", heading.get_text(" ", strip=True))
+        title = heading_text.split(" - ", 1)[1].strip() if " - " in heading_text else heading_text
+
+    credits_match = CREDITS_RE.search(text)
+    prereq_match = PREREQ_RE.search(text)
+    return {
+        "title": title,
+        "credits": credits_match.group(1).replace(" ", "") if credits_match else None,
+        "prerequisites": prereq_match.group(1).strip() if prereq_match else None,
+    }
+
+
+def enrich_requirements(all_requirements, course_refs, fetch, max_workers=DEFAULT_ENRICH_WORKERS,
+                        parser="html.parser"):
+    """Add title, credits and prerequisites to every linked course in place.
+
+    course_refs maps program name to {code: course page URL}. Each distinct
+    URL is fetched once per run no matter how many programs list it, using
+    fetch(url) (which should go through the response cache) on a bounded
+    thread pool. Returns the number of distinct course pages fetched.
+    """
+    urls = []
+    seen = set()
+    for requirements in all_requirements:
+        refs = course_refs.get(requirements.get("program"), {})
+        for courses in requirements.get("categories", {}).values():
+            for course in courses:
+                url = refs.get(course["code"])
+                if url and url not in seen:
+                    seen.add(url)
+                    urls.append(url)
+
+    def fetch_details(url):
+        try:
+            response = fetch(url)
+        except Exception as e:
+            print(f"Could not fetch course page {url}: {e}")
+            return None
+        if response.status_code != 200:
+            return None
+        return parse_course_page(response.content, parser=parser)
+
+    with ThreadPoolExecutor(max_workers=max(max_workers, 1)) as executor:
+        details = dict(zip(urls, executor.map(fetch_details, urls)))
+
+    for requirements in all_requirements:
+        refs = course_refs.get(requirements.get("program"), {})
+        for courses in requirements.get("categories", {}).values():
+            for course in courses:
+                info = details.get(refs.get(course["code"]))
+                if not info:
+                    continue
+                if not course.get("name") and info["title"]:
+                    course["name"] = info["title"]
+                    course["name_source"] = "course_page"
+                course.update({key: value for key, value in info.items() if value is not None})
+
+    return len(urls)
+
+
+def strip_course_details(requirements):
+    """Return a deep copy of one program's requirements without enrich_requirements' fields.
+
+    Reused requirements go through this so the previous run's objects are
+    never mutated and every program is enriched (or not) the same way.
+    """
+    requirements = copy.deepcopy(requirements)
+    for courses in requirements.get("categories", {}).values():
+        for course in courses:
+            if course.get("name_source") == "course_page":
+                course["name"] = ""
+            for field in DETAIL_FIELDS:
+                course.pop(field, None)
+    return requirements
@@ -0,0 +1,187 @@
+"""Browser-free extraction of the PeopleSoft Course History grid.
+
+    python course_history_parser.py "My Course History.html" archive/*.html --output courses.json
+
+Pages are parsed in one streaming pass; files are memory-mapped and fed to
+the parser in chunks rather than read into a single string, so archived
+pages can be re-processed in bulk.
+"""
+from html.parser import HTMLParser
+import argparse
+import codecs
+import json
+import mmap
+import re
+
+COURSE_NAME_PREFIX = "CRSE_NAME$"
+# Field id prefixes per course row suffix, in the order the scraper tries them
+GRADE_PREFIXES = ["GRADE_TBL_GRADE_INPUT$", "CRSE_GRADE_OFF$"]
+CREDITS_PREFIXES = ["STDNT_ENRL_UNITS_TAKEN$", "UNITS_TAKEN$"]
+TERM_PREFIXES = ["TERM_TBL_DESCR$"]
+FIELD_PREFIXES = {
+    "grade": GRADE_PREFIXES,
+    "credits": CREDITS_PREFIXES,
+    "term": TERM_PREFIXES,
+}
+CHUNK_SIZE = 64 * 1024
+
+
+def build_course_info(course_code_name, grade, credits, term):
+    """Turn one row's raw field text into a course record"""
+    course_info = {
+        'course_code_name': course_code_name,
+        'grade': grade,
+        'credits': credits,
+        'term': term,
+    }
+    # Basic parsing of course code (assuming format like 'SUBJ 123')
+    match = re.match(r"([A-Za-z]+)\s*(\d+)", course_code_name)
+    if match:
+        course_info['course_code'] = f"{match.group(1)} {match.group(2)}"
+        course_info['course_name'] = course_code_name # Keep full name for now
+    else:
+        course_info['course_code'] = course_code_name # Fallback
+        course_info['course_name'] = course_code_name
+    return course_info
+
+
+def unique_courses(rows):
+    """Keep the first row for each course code + term, like the live scraper"""
+    courses = []
+    seen_courses = set()
+    for course_info in rows:
+        course_identifier = course_info['course_code'] + '_' + course_info['term']
+        if course_info['course_code'] and course_identifier not in seen_courses:
+            courses.append(course_info)
+            seen_courses.add(course_identifier)
+    return courses
+
+
+class CourseHistoryParser(HTMLParser):
+    """Collects the text of the grid's CRSE_NAME/grade/credits/term spans.
+
+    Only spans whose id carries one of the known prefixes are buffered;
+    everything else on the page is skipped as it streams past.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.names = []     # (suffix, text) in document order
+        self.fields = {}    # (prefix, suffix) -> text, first occurrence wins
+        self._capture = None
+        self._depth = 0
+        self._text = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag != "span":
+            return
+        if self._capture is not None:
+            self._depth += 1
+            return
+        span_id = dict(attrs).get("id") or ""
+        prefix, sep, suffix = span_id.rpartition("$")
+        if sep and (prefix + sep == COURSE_NAME_PREFIX
+                    or any(prefix + sep in prefixes for prefixes in FIELD_PREFIXES.values())):
+            self._capture = (prefix + sep, suffix)
+            self._depth = 0
+            self._text = []
+
+    def handle_endtag(self, tag):
+        if tag != "span" or self._capture is None:
+            return
+        if self._depth:
+            self._depth -= 1
+            return
+        prefix, suffix = self._capture
+        text = " ".join("".join(self._text).split())
+        if prefix == COURSE_NAME_PREFIX:
+            self.names.append((suffix, text))
+        else:
+            self.fields.setdefault((prefix, suffix), text)
+        self._capture = None
+
+    def handle_data(self, data):
+        if self._capture is not None:
+            self._text.append(data)
+
+    def rows(self):
+        def first_text(prefixes, suffix):
+            for prefix in prefixes:
+                if (prefix, suffix) in self.fields:
+                    return self.fields[(prefix, suffix)]
+            return 'Unknown'
+
+        return [
+            build_course_info(
+                name,
+                first_text(GRADE_PREFIXES, suffix),
+                first_text(CREDITS_PREFIXES, suffix),
+                first_text(TERM_PREFIXES, suffix),
+            )
+            for suffix, name in self.names
+        ]
+
+
+def _parse_buffer(buffer, encoding="utf-8"):
+    # Decode and feed chunk by chunk so only one chunk of text exists at a time
+    if isinstance(buffer, str):
+        buffer = buffer.encode(encoding)
+    if buffer.find(COURSE_NAME_PREFIX.encode()) == -1:
+        return []
+    parser = CourseHistoryParser()
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    view = memoryview(buffer)
+    for start in range(0, len(view), CHUNK_SIZE):
+        parser.feed(decoder.decode(view[start:start + CHUNK_SIZE]))
+    parser.feed(decoder.decode(b"", final=True))
+    parser.close()
+    view.release()
+    return parser.rows()
+
+
+def parse_course_history_html(html):
+    """Extract course rows from a fetched Course History page (bytes or str).
+
+    For each CRSE_NAME$n span, the first listed field prefix with a span
+    for the same n supplies that field, and a missing field becomes
+    'Unknown'. Returns rows in page order, before dedupe.
+    """
+    return _parse_buffer(html)
+
+
+def parse_course_history_file(path):
+    """Extract course rows from a saved Course History page via mmap"""
+    with open(path, "rb") as f:
+        if f.seek(0, 2) == 0:
+            return []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return _parse_buffer(mapped)
+
+
+def is_course_history_page(html):
+    """True when the page contains the Course History grid"""
+    return COURSE_NAME_PREFIX.encode() in html if isinstance(html, bytes) else COURSE_NAME_PREFIX in html
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Extract courses from saved Course History pages")
+    parser.add_argument("pages", nargs="+", help="saved Course History HTML files")
+    parser.add_argument("--output", help="write {page: courses} as JSON instead of printing a summary")
+    parser.add_argument("--all-rows", action="store_true", help="keep duplicate code+term rows")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    results = {}
+    for page in args.pages:
+        rows = parse_course_history_file(page)
+        results[page] = rows if args.all_rows else unique_courses(rows)
+        if results[page]:
+            print(f"✅ {page}: {len(results[page])} courses")
+        else:
+            print(f"⚠️ {page}: no Course History grid (the saved portal shell keeps it in the content iframe)")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Saved courses from {len(results)} pages to {args.output}")
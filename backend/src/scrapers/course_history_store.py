@@ -0,0 +1,94 @@
+import hashlib
+import json
+import time
+import re
+import os
+
+# Anchored to this package so every worker and entry point sees the same records
+DEFAULT_HISTORY_DIR = os.environ.get(
+    "SCRAPER_HISTORY_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "app_data", "course_history"))
+# Grades that mean a row can still change
+OPEN_GRADES = {"", "Unknown", "IP", "I", "NR", "NG"}
+
+
+def row_key(course):
+    """Same code+term identity the scraper dedupes on"""
+    return course['course_code'] + '_' + course['term']
+
+
+def row_hash(course):
+    return hashlib.sha256(json.dumps(course, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def history_path(user, history_dir=DEFAULT_HISTORY_DIR):
+    return os.path.join(history_dir, re.sub(r"[^A-Za-z0-9_.-]", "_", user) + ".json")
+
+
+def load_history(user, history_dir=DEFAULT_HISTORY_DIR):
+    """Return the student's stored record, or an empty one"""
+    try:
+        with open(history_path(user, history_dir), "r") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {"user": user, "updated_at": None, "terms": {}, "rows": {}}
+
+
+def save_history(history, history_dir=DEFAULT_HISTORY_DIR):
+    """Write the record atomically so a crash never leaves half a file"""
+    path = history_path(history["user"], history_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    history["updated_at"] = time.strftime("%Y-%m-%dT%H:%M:%S%z")
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(history, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def frozen_terms(history):
+    """Terms whose every row already has a final grade and so need not be read again"""
+    # Rows whose term could not be read cannot be told apart, so they are always re-read
+    return {term for term, info in history["terms"].items() if info.get("final") and term != "Unknown"}
+
+
+def merge_rows(history, rows, skipped_terms=()):
+    """Merge freshly extracted rows into the stored record.
+
+    rows covers every term except skipped_terms. A row is added when its
+    code+term is new and changed when its hash differs; stored rows of a
+    scanned term that no longer appear are removed, unless rows is empty,
+    which means extraction failed rather than that every course vanished.
+    Returns {"added": [...], "changed": [...], "removed": [...]}.
+    """
+    stored = history["rows"]
+    delta = {"added": [], "changed": [], "removed": []}
+    seen = set()
+    for course in rows:
+        key = row_key(course)
+        seen.add(key)
+        digest = row_hash(course)
+        if key not in stored:
+            delta["added"].append(course)
+        elif stored[key]["hash"] != digest:
+            delta["changed"].append(course)
+        else:
+            continue
+        stored[key] = {"hash": digest, "course": course}
+
+    if rows:
+        for key in [key for key, row in stored.items()
+                    if key not in seen and row["course"]["term"] not in skipped_terms]:
+            delta["removed"].append(stored.pop(key)["course"])
+
+    terms = {}
+    for row in stored.values():
+        course = row["course"]
+        terms.setdefault(course["term"], True)
+        if course["grade"].strip() in OPEN_GRADES:
+            terms[course["term"]] = False
+    history["terms"] = {term: {"final": final} for term, final in terms.items()}
+    return delta
+
+
+def history_courses(history):
+    """Every stored course, in the order rows were first seen"""
+    return [row["course"] for row in history["rows"].values()]
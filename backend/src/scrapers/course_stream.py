@@ -0,0 +1,68 @@
+"""NDJSON output for the MySlice scrape.
+
+    python ScrapeCourses.py --ndjson [username password]
+
+stdout carries one compact JSON object per line: a {"type": "course", ...}
+record as soon as each course is extracted, then a single
+{"type": "summary", ...} record when the run ends. Everything the scraper
+prints goes to stderr instead, so the stream stays parseable line by line.
+"""
+from contextlib import contextmanager, redirect_stdout
+import threading
+import json
+import time
+import sys
+
+
+class CourseStream:
+    """Writes course and summary records to out, flushing after every line"""
+
+    def __init__(self, out):
+        self.out = out
+        self.count = 0
+        self.first_course_ms = None
+        self._seen = set()
+        self._lock = threading.Lock()
+        self._start = time.monotonic()
+
+    def emit(self, record):
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with self._lock:
+            self.out.write(line)
+            self.out.flush()
+
+    def course(self, course):
+        """Emit a course unless the same code+term was already streamed"""
+        key = course['course_code'] + '_' + course['term']
+        with self._lock:
+            if not course['course_code'] or key in self._seen:
+                return
+            self._seen.add(key)
+            self.count += 1
+            if self.first_course_ms is None:
+                self.first_course_ms = round((time.monotonic() - self._start) * 1000)
+        self.emit({"type": "course", **course})
+
+    def summary(self, result):
+        result = result or {"success": False, "message": "Login failed."}
+        changes = result.get("changes") or {}
+        self.emit({
+            "type": "summary",
+            "success": bool(result.get("success")),
+            "message": result.get("message"),
+            "source": result.get("source"),
+            "courses": len(result.get("courses") or []),
+            "streamed": self.count,
+            "changes": {kind: len(rows) for kind, rows in changes.items()},
+            "views": result.get("views") or {},
+            "first_course_ms": self.first_course_ms,
+            "elapsed_ms": round((time.monotonic() - self._start) * 1000),
+        })
+
+
+@contextmanager
+def stdout_stream():
+    """Yield a CourseStream on the real stdout while prints are sent to stderr"""
+    stream = CourseStream(sys.stdout)
+    with redirect_stdout(sys.stderr):
+        yield stream
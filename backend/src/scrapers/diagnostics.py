@@ -0,0 +1,103 @@
+from collections import deque
+import threading
+import base64
+import atexit
+import queue
+import json
+import time
+import os
+
+# off: capture nothing; errors: only failure points; trace: every checkpoint
+LEVELS = {"off": 0, "errors": 1, "trace": 2}
+DEFAULT_LEVEL = os.environ.get("SCRAPER_DIAGNOSTICS", "errors")
+DEFAULT_RING_SIZE = int(os.environ.get("SCRAPER_DIAGNOSTICS_RING", "20"))
+MANIFEST_FILENAME = "captures.json"
+
+
+class DiagnosticsWriter:
+    """Background thread that writes flushed captures to disk"""
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, directory, captures):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="diagnostics-writer", daemon=True)
+                self._thread.start()
+        self._queue.put((directory, captures))
+
+    def _run(self):
+        while True:
+            directory, captures = self._queue.get()
+            try:
+                self._write(directory, captures)
+            except Exception as e:
+                print(f"⚠️ Could not write diagnostics to {directory}: {e}")
+            finally:
+                self._queue.task_done()
+
+    @staticmethod
+    def _write(directory, captures):
+        os.makedirs(directory, exist_ok=True)
+        manifest = []
+        for index, capture in enumerate(captures):
+            entry = {key: value for key, value in capture.items() if key != "png"}
+            if capture.get("png"):
+                entry["file"] = f"{index:02d}_{capture['name']}.png"
+                with open(os.path.join(directory, entry["file"]), "wb") as f:
+                    f.write(base64.b64decode(capture["png"]))
+            manifest.append(entry)
+        with open(os.path.join(directory, MANIFEST_FILENAME), "w") as f:
+            json.dump(manifest, f, indent=2)
+
+    def drain(self):
+        """Wait until every submitted capture has been written"""
+        if self._thread is not None:
+            self._queue.join()
+
+
+writer = DiagnosticsWriter()
+# Captures flushed just before exit still reach the disk
+atexit.register(writer.drain)
+
+
+class DiagnosticsRecorder:
+    """Keeps the last ring_size captures of a run in memory.
+
+    Nothing is written while the run is healthy: discard() drops the buffer
+    after a successful run, flush() hands it to the background writer after
+    a failed one.
+    """
+
+    def __init__(self, level=DEFAULT_LEVEL, ring_size=DEFAULT_RING_SIZE):
+        if level not in LEVELS:
+            raise ValueError(f"Unknown diagnostics level {level!r}, expected one of {', '.join(LEVELS)}")
+        self.level = LEVELS[level]
+        self.captures = deque(maxlen=ring_size)
+
+    def capture(self, driver, name, error=False):
+        """Record a screenshot and the page URL if the level asks for this checkpoint"""
+        if self.level < (LEVELS["errors"] if error else LEVELS["trace"]):
+            return
+        capture = {"name": name, "error": error, "ts": round(time.time(), 3)}
+        try:
+            capture["url"] = driver.current_url
+            # Kept as the base64 the driver returns; decoding happens on the writer thread
+            capture["png"] = driver.get_screenshot_as_base64()
+        except Exception as e:
+            capture["capture_error"] = str(e)
+        self.captures.append(capture)
+
+    def discard(self):
+        self.captures.clear()
+
+    def flush(self, directory):
+        """Write the buffered captures to directory in the background, returning how many"""
+        captures = list(self.captures)
+        self.captures.clear()
+        if captures:
+            writer.submit(directory, captures)
+        return len(captures)
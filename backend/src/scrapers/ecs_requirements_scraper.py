@@ -1,5 +1,18 @@
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup, SoupStrainer, Tag
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, urljoin, parse_qs
+from http_cache import ResponseCache, DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES
+from rate_limiter import AdaptiveRateLimiter
+from catalog_store import CatalogStore, DEFAULT_STORE_PATH
+from course_details import find_course_refs, enrich_requirements, strip_course_details, DEFAULT_ENRICH_WORKERS
+import argparse
+import itertools
+import hashlib
+import threading
+import tracemalloc
+import time
 import json
 import re
 import os
@@ -19,142 +32,807 @@ PROGRAM_IDS = {
     "Systems & Information Science": "19224"
 }
 
-def scrape_program_requirements(program_name, poid):
-    url = f"{BASE_URL}{poid}"
-    response = requests.get(url)
-    soup = BeautifulSoup(response.content, "html.parser")
+PROGRAM_URL = "https://courses.syracuse.edu/preview_program.php?catoid={catoid}&poid={poid}"
+CATALOG_HOME_URL = "https://courses.syracuse.edu/index.php?catoid={catoid}"
+CATALOG_ID = parse_qs(urlsplit(BASE_URL).query)["catoid"][0]
 
-    # Find all acalog-core divs
-    acalog_divs = soup.find_all("div", class_="acalog-core")
-    if not acalog_divs:
-        return {"program": program_name, "error": "No content found"}
+# Undergraduate catalog ids by academic year; CATALOG_ID is the current one
+CATALOG_YEARS = {
+    "2024-2025": "38",
+    "2023-2024": "35",
+    "2022-2023": "32",
+    "2021-2022": "30",
+    "2020-2021": "26",
+}
+CURRENT_CATALOG_YEAR = "2024-2025"
+# Catalog index pages ("Academic Offerings") that link to every program
+DISCOVERY_INDEX_URLS = ["https://courses.syracuse.edu/content.php?catoid=38&navoid=4777"]
+
+# Output files written under OUTPUT_DIR by main()
+OUTPUT_DIR = "app_data"
+OUTPUT_FILENAME = "ecs_requirements_cleaned.json"
+STATE_FILENAME = "ecs_requirements_state.json"
+DELTA_FILENAME = "ecs_requirements_delta.json"
+PROGRESS_FILENAME = "ecs_crawl_progress.jsonl"
+# Resumed crawls stop refetching a failing program after this many attempts
+MAX_PROGRAM_ATTEMPTS = 3
+INDEX_FILENAME = "ecs_requirements_index.json"
+COURSE_INDEX_VERSION = 1
+# Bump whenever extraction or the requirements format changes, so state saved
+# by an older extractor is never reused for an unchanged page
+EXTRACTOR_VERSION = 1
+
+# Concurrency settings for a full catalog refresh
+DEFAULT_MAX_WORKERS = 4
+REQUEST_TIMEOUT = 30
+
+# One pooled keep-alive session per catalog host, shared by all workers
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+def get_session(url, pool_size=DEFAULT_MAX_WORKERS):
+    """Return the shared keep-alive session for the host serving url"""
+    host = urlsplit(url).netloc
+    with _sessions_lock:
+        session = _sessions.get(host)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(pool_size, 1))
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _sessions[host] = session
+        return session
+
+# Tree builder used for catalog pages; "auto" prefers lxml when it is installed
+DEFAULT_PARSER = "auto"
+# Only the acalog-core blocks hold requirement content
+ACALOG_CORE_STRAINER = SoupStrainer("div", class_="acalog-core")
+
+# Parse profiling serializes parses so tracemalloc peaks are per page
+_profile_lock = threading.Lock()
+
+def resolve_parser(parser=DEFAULT_PARSER):
+    """Map "auto" to the fastest installed tree builder"""
+    if parser != "auto":
+        return parser
+    try:
+        import lxml  # noqa: F401
+        return "lxml"
+    except ImportError:
+        return "html.parser"
+
+def parse_catalog_page(content, parser=DEFAULT_PARSER, only_core=True):
+    """Build the soup for a catalog page, optionally keeping only acalog-core blocks"""
+    parse_only = ACALOG_CORE_STRAINER if only_core else None
+    return BeautifulSoup(content, resolve_parser(parser), parse_only=parse_only)
+
+def profile_parse(content, parser=DEFAULT_PARSER, only_core=True):
+    """Parse a page while measuring wall time and peak traced memory"""
+    with _profile_lock:
+        was_tracing = tracemalloc.is_tracing()
+        if not was_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        start = time.perf_counter()
+        soup = parse_catalog_page(content, parser=parser, only_core=only_core)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        if not was_tracing:
+            tracemalloc.stop()
+    stats = {
+        "parser": resolve_parser(parser),
+        "only_core": only_core,
+        "page_bytes": len(content),
+        "parse_seconds": round(elapsed, 4),
+        "peak_kib": round((peak - baseline) / 1024, 1),
+    }
+    return soup, stats
+
+SECTION_HEADINGS = ["h2", "h3", "h4"]
+SKIPPED_SECTIONS = [
+    "learning outcomes", "academic standards", "intra-university",
+    "student learning", "advisement", "distribution", "program of study"
+]
+COURSE_CODE_RE = re.compile(r'([A-Z]{2,4}\s\d{3}[A-Z]?)')
+
+def collect_element_courses(elem, courses, seen):
+    """Add the courses mentioned under one section element in a single DOM walk.
+
+    Matches are gathered per source and applied in the original order:
+    acalog-course list items (always kept, with names), codes in other list
+    items, preview_course links, then paragraph text. Every source after the
+    first is deduplicated against the codes already in seen.
+    """
+    is_list = elem.name in ("ul", "ol")
+    listed_codes = []
+    li_codes = []
+    link_codes = []
+
+    for node in elem.descendants:
+        if not isinstance(node, Tag):
+            continue
+        if node.name == "li" and is_list:
+            if "acalog-course" in node.get("class", []):
+                course_link = node.find("a")
+                if course_link:
+                    course_text = course_link.get_text(strip=True)
+                    course_code_match = COURSE_CODE_RE.search(course_text)
+                    if course_code_match:
+                        course_name = course_text.split("-", 1)[1].strip() if "-" in course_text else ""
+                        listed_codes.append((course_code_match.group(1), course_name))
+            else:
+                # Look for course codes like "XXX 123" in the text
+                li_codes.extend(COURSE_CODE_RE.findall(node.get_text(strip=True)))
+        elif node.name == "a" and node.get("href") is not None:
+            if "preview_course" in node["href"]:
+                course_code_match = COURSE_CODE_RE.search(node.get_text(strip=True))
+                if course_code_match:
+                    link_codes.append(course_code_match.group(1))
+
+    for code, name in listed_codes:
+        courses.append({"code": code, "name": name})
+        seen.add(code)
+
+    text_codes = COURSE_CODE_RE.findall(elem.get_text(strip=True)) if elem.name == "p" else []
+    for code in itertools.chain(li_codes, link_codes, text_codes):
+        if code not in seen:
+            courses.append({"code": code, "name": ""})
+            seen.add(code)
+
+def extract_section_courses(heading):
+    """Return the courses listed between heading and the next sibling heading"""
+    courses = []
+    seen = set()
+    next_elem = heading.find_next_sibling()
+    while next_elem and next_elem.name not in SECTION_HEADINGS:
+        collect_element_courses(next_elem, courses, seen)
+        next_elem = next_elem.find_next_sibling()
+    return courses
+
+def fetch_page(url, session=None, cache=None, offline=False, limiter=None):
+    """Fetch a catalog page, going through the response cache and rate limiter when given"""
+    session = session or get_session(url)
+    if limiter is not None and not offline:
+        return limiter.call(fetch_page, url, session=session, cache=cache, offline=offline)
+    if cache is not None:
+        return cache.fetch(session, url, offline=offline, timeout=REQUEST_TIMEOUT)
+    return session.get(url, timeout=REQUEST_TIMEOUT)
+
+def find_index_urls(catoid, session=None, cache=None, offline=False, limiter=None, parser=DEFAULT_PARSER):
+    """Locate a catalog's Academic Offerings index from its home page navbar"""
+    if catoid == CATALOG_ID:
+        return DISCOVERY_INDEX_URLS
+    home_url = CATALOG_HOME_URL.format(catoid=catoid)
+    response = fetch_page(home_url, session=session, cache=cache, offline=offline, limiter=limiter)
+    soup = parse_catalog_page(response.content, parser=parser, only_core=False)
+    for link in soup.find_all("a", href=True):
+        if "academic offerings" in link.get_text(" ", strip=True).lower():
+            url = urljoin(home_url, link["href"])
+            if parse_qs(urlsplit(url).query).get("catoid", [None])[0] == catoid:
+                return [url]
+    raise ValueError(f"No Academic Offerings index found for catalog {catoid}")
+
+def discover_programs(index_urls=None, session=None, cache=None, offline=False, limiter=None,
+                      parser=DEFAULT_PARSER, catoid=CATALOG_ID):
+    """List {program name: poid} for every program linked from the catalog index.
+
+    Follows the index's paginated listing (filter[cpage]) and keeps programs
+    in the order they are first linked.
+    """
+    index_urls = DISCOVERY_INDEX_URLS if index_urls is None else index_urls
+    pending = list(index_urls)
+    visited = set()
+    programs = {}
+    seen_poids = set()
 
-    requirements = {"program": program_name, "total_credits": None, "categories": {}}
+    while pending:
+        page_url = pending.pop(0)
+        if page_url in visited:
+            continue
+        visited.add(page_url)
+        print(f"Discovering programs from {page_url}...")
+        response = fetch_page(page_url, session=session, cache=cache, offline=offline, limiter=limiter)
+        soup = parse_catalog_page(response.content, parser=parser, only_core=False)
+        page_query = parse_qs(urlsplit(page_url).query)
 
-    # Look for total credits information throughout the page content
+        for link in soup.find_all("a", href=True):
+            href = urljoin(page_url, link["href"])
+            parts = urlsplit(href)
+            query = parse_qs(parts.query)
+            if query.get("catoid", [None])[0] != catoid:
+                continue
+            if parts.path.endswith("preview_program.php") and "poid" in query:
+                poid = query["poid"][0]
+                name = re.sub(r"\s+", " ", link.get_text(" ", strip=True))
+                if poid in seen_poids or not name:
+                    continue
+                seen_poids.add(poid)
+                programs[f"{name} ({poid})" if name in programs else name] = poid
+            elif (parts.path.endswith("content.php") and "filter[cpage]" in query
+                  and query.get("navoid") == page_query.get("navoid")):
+                pending.append(href.split("#", 1)[0])
+
+    print(f"Discovered {len(programs)} programs")
+    return programs
+
+def programs_for_catalog(catoid, discover=False, index_urls=None, session=None, cache=None,
+                         offline=False, limiter=None, parser=DEFAULT_PARSER):
+    """Return {program name: poid} to scrape for a catalog.
+
+    Program ids differ between catalog years, so archived catalogs are always
+    discovered. Unless discover is set, they are narrowed to the PROGRAM_IDS
+    programs and renamed to match, so a program keeps its name across years.
+    """
+    if catoid == CATALOG_ID and not discover:
+        return PROGRAM_IDS
+    if catoid != CATALOG_ID or index_urls is None:
+        index_urls = find_index_urls(catoid, session=session, cache=cache, offline=offline,
+                                     limiter=limiter, parser=parser)
+    discovered = discover_programs(index_urls, session=session, cache=cache, offline=offline,
+                                   limiter=limiter, parser=parser, catoid=catoid)
+    if discover:
+        return discovered
+
+    programs = {}
+    for name, poid in discovered.items():
+        for program_name in PROGRAM_IDS:
+            if program_name not in programs and (name == program_name or name.startswith(program_name + ",")):
+                programs[program_name] = poid
+    return {name: programs[name] for name in PROGRAM_IDS if name in programs}
+
+class CrawlProgress:
+    """Finished programs of an in-progress crawl, persisted after each one.
+
+    Lets an interrupted crawl resume without refetching programs that were
+    already scraped successfully. Each finished program is appended as one
+    JSON line, so recording stays cheap however large the crawl gets; on
+    resume the last line per program wins. Failed programs are recorded
+    too, with their attempt count, and are retried on resume only until
+    MAX_PROGRAM_ATTEMPTS. The file is removed once no program is left to
+    retry.
+    """
+
+    def __init__(self, path, resume=False):
+        self.path = path
+        self._lock = threading.Lock()
+        if resume:
+            self.done = self.load(path)
+        else:
+            self.done = {}
+            self.clear()
+
+    @staticmethod
+    def load(path):
+        """Read the progress lines, skipping a line cut short by an interrupted write"""
+        done = {}
+        line = "\n"
+        try:
+            with open(path, "r") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    done[entry.pop("program")] = entry
+            if not line.endswith("\n"):
+                # Start the next record on its own line
+                with open(path, "a") as f:
+                    f.write("\n")
+        except OSError:
+            pass
+        return done
+
+    def get(self, program_name, poid):
+        """The finished entry for a program, or None if it must be (re)scraped"""
+        entry = self.done.get(program_name)
+        if not entry or entry["poid"] != poid:
+            return None
+        if "error" in entry:
+            return entry if entry["attempts"] >= MAX_PROGRAM_ATTEMPTS else None
+        if (entry["fingerprint"] or {}).get("extractor_version") == EXTRACTOR_VERSION:
+            return entry
+        return None
+
+    def retryable(self, program_name):
+        """True while a failed program has attempts left"""
+        entry = self.done.get(program_name) or {}
+        return entry.get("attempts", 0) < MAX_PROGRAM_ATTEMPTS
+
+    def record(self, program_name, poid, requirements, fingerprint):
+        with self._lock:
+            if "error" in requirements:
+                previous = self.done.get(program_name) or {}
+                attempts = previous.get("attempts", 0) if previous.get("poid") == poid else 0
+                entry = {"poid": poid, "error": requirements["error"], "attempts": attempts + 1}
+            else:
+                entry = {"poid": poid, "requirements": requirements, "fingerprint": fingerprint}
+            self.done[program_name] = entry
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "a") as f:
+                f.write(json.dumps({"program": program_name, **entry}, separators=(",", ":")) + "\n")
+
+    def clear(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+def hash_bytes(content):
+    return hashlib.sha256(content).hexdigest()
+
+def hash_program_content(soup):
+    """Hash the acalog-core markup with whitespace normalized"""
+    markup = "".join(str(div) for div in soup.find_all("div", class_="acalog-core"))
+    return hash_bytes(re.sub(r"\s+", " ", markup).strip().encode("utf-8"))
+
+def scrape_program_requirements(program_name, poid, session=None, cache=None, offline=False,
+                                parser=DEFAULT_PARSER, only_core=True, parse_stats=None,
+                                previous=None, fingerprints=None, limiter=None, catoid=CATALOG_ID):
+    """Fetch and parse one program page.
+
+    previous is the program's entry from the last run ({"raw_hash",
+    "content_hash", "extractor_version", "requirements"}); when the page is
+    unchanged and was extracted by the current EXTRACTOR_VERSION, a copy of
+    its requirements, without course-page details, is returned without
+    re-extracting them. The hashes of
+    this run, along with the page's course links, are recorded in
+    fingerprints[program_name] when given.
+    """
+    url = PROGRAM_URL.format(catoid=catoid, poid=poid)
+    response = fetch_page(url, session=session, cache=cache, offline=offline, limiter=limiter)
+    previous = previous or {}
+    # A different extractor version counts as changed, whatever the hashes say
+    reusable = "requirements" in previous and previous.get("extractor_version") == EXTRACTOR_VERSION
+
+    raw_hash = hash_bytes(response.content)
+    if reusable and previous.get("raw_hash") == raw_hash:
+        if fingerprints is not None:
+            fingerprints[program_name] = {"raw_hash": raw_hash, "content_hash": previous.get("content_hash"),
+                                          "extractor_version": EXTRACTOR_VERSION,
+                                          "course_refs": previous.get("course_refs", {})}
+        return strip_course_details(previous["requirements"])
+
+    if parse_stats is not None:
+        soup, stats = profile_parse(response.content, parser=parser, only_core=only_core)
+        parse_stats.append(dict(stats, program=program_name))
+    else:
+        soup = parse_catalog_page(response.content, parser=parser, only_core=only_core)
+
+    content_hash = hash_program_content(soup)
+    if fingerprints is not None:
+        fingerprints[program_name] = {"raw_hash": raw_hash, "content_hash": content_hash,
+                                      "extractor_version": EXTRACTOR_VERSION,
+                                      "course_refs": find_course_refs(soup)}
+    if reusable and previous.get("content_hash") == content_hash:
+        return strip_course_details(previous["requirements"])
+
+    return extract_program_requirements(program_name, soup)
+
+def find_total_credits(acalog_divs):
+    """Look for total credits information throughout the page content"""
     full_text = " ".join([div.get_text(" ", strip=True) for div in acalog_divs])
     credit_match = re.search(r"(\d{2,3}(?:-\d{2,3})?)\s*credits? required", full_text, re.I) or \
                   re.search(r"minimum of (\d{2,3}(?:-\d{2,3})?)\s*credits", full_text, re.I) or \
                   re.search(r"requires (\d{2,3}(?:-\d{2,3})?)\s*credits", full_text, re.I) or \
                   re.search(r"(\d{2,3}(?:-\d{2,3})?)\s*credits", full_text, re.I)
-    
-    requirements["total_credits"] = credit_match.group(1) + " credits" if credit_match else None
+    return credit_match.group(1) + " credits" if credit_match else None
 
-    # Keep track of core requirements and electives
-    core_requirements = []
-    technical_electives = []
-    other_requirements = {}
-
-    # Process each acalog-core div section
+def walk_sections(acalog_divs):
+    """Return (category name, courses) for every requirement section that lists courses"""
+    sections = []
     for div in acalog_divs:
-        # Find heading elements
-        headings = div.find_all(["h2", "h3", "h4"])
-        
-        for heading in headings:
+        for heading in div.find_all(SECTION_HEADINGS):
             category_name = heading.get_text(strip=True).strip()
             # Skip certain headings that don't contain course requirements
-            if any(skip in category_name.lower() for skip in [
-                "learning outcomes", "academic standards", "intra-university", 
-                "student learning", "advisement", "distribution", "program of study"
-            ]):
+            if any(skip in category_name.lower() for skip in SKIPPED_SECTIONS):
                 continue
-                
-            # Find course lists
-            courses = []
-            next_elem = heading.find_next_sibling()
-            
-            while next_elem and next_elem.name not in ["h2", "h3", "h4"]:
-                # Look for course links in the section
-                if next_elem.name in ["ul", "ol"]:
-                    for li in next_elem.find_all("li", class_="acalog-course"):
-                        course_link = li.find("a")
-                        if course_link:
-                            course_text = course_link.get_text(strip=True)
-                            course_code_match = re.search(r'([A-Z]{2,4}\s\d{3}[A-Z]?)', course_text)
-                            if course_code_match:
-                                course_code = course_code_match.group(1)
-                                course_name = course_text.split("-", 1)[1].strip() if "-" in course_text else ""
-                                course_info = {
-                                    "code": course_code,
-                                    "name": course_name
-                                }
-                                courses.append(course_info)
-                    
-                    # Look for non-course list items that might contain course information
-                    for li in next_elem.find_all("li"):
-                        if "acalog-course" not in li.get("class", []):
-                            li_text = li.get_text(strip=True)
-                            # Look for course codes like "XXX 123" in the text
-                            course_codes = re.findall(r'([A-Z]{2,4}\s\d{3}[A-Z]?)', li_text)
-                            for code in course_codes:
-                                if not any(c.get("code") == code for c in courses):
-                                    courses.append({"code": code, "name": ""})
-                
-                # Look for direct course links
-                for a_tag in next_elem.find_all("a", href=True):
-                    if "preview_course" in a_tag.get("href", ""):
-                        course_text = a_tag.get_text(strip=True)
-                        course_code_match = re.search(r'([A-Z]{2,4}\s\d{3}[A-Z]?)', course_text)
-                        if course_code_match:
-                            course_code = course_code_match.group(1)
-                            if not any(c.get("code") == course_code for c in courses):
-                                courses.append({"code": course_code, "name": ""})
-                
-                # Extract text to look for course mentions
-                p_text = next_elem.get_text(strip=True) if next_elem.name == "p" else ""
-                course_codes = re.findall(r'([A-Z]{2,4}\s\d{3}[A-Z]?)', p_text)
-                for code in course_codes:
-                    if not any(c.get("code") == code for c in courses):
-                        courses.append({"code": code, "name": ""})
-                
-                next_elem = next_elem.find_next_sibling()
-            
+
+            courses = extract_section_courses(heading)
             if courses:
-                # Categorize the courses based on section names
-                if "core" in category_name.lower():
-                    core_requirements.extend(courses)
-                elif "technical elective" in category_name.lower() or "upper division" in category_name.lower():
-                    technical_electives.extend(courses)
-                else:
-                    other_requirements[category_name] = courses
-    
+                sections.append((category_name, courses))
+    return sections
+
+def categorize_sections(sections):
+    """Group sections into core, technical elective and named categories"""
+    categories = {}
+    core_requirements = []
+    technical_electives = []
+    other_requirements = {}
+
+    for category_name, courses in sections:
+        # Categorize the courses based on section names
+        if "core" in category_name.lower():
+            core_requirements.extend(courses)
+        elif "technical elective" in category_name.lower() or "upper division" in category_name.lower():
+            technical_electives.extend(courses)
+        else:
+            other_requirements[category_name] = courses
+
     # Add categorized courses to requirements
     if core_requirements:
-        requirements["categories"]["Core Requirements"] = core_requirements
+        categories["Core Requirements"] = core_requirements
     if technical_electives:
-        requirements["categories"]["Technical Electives"] = technical_electives
-    
+        categories["Technical Electives"] = technical_electives
+
     # Add other categories
     for category, courses in other_requirements.items():
-        if category not in requirements["categories"]:
-            requirements["categories"][category] = courses
+        if category not in categories:
+            categories[category] = courses
 
-    return requirements
+    return categories
+
+def extract_program_requirements(program_name, soup):
+    """Build the requirements record for a parsed program page"""
+    # Find all acalog-core divs
+    acalog_divs = soup.find_all("div", class_="acalog-core")
+    if not acalog_divs:
+        return {"program": program_name, "error": "No content found"}
+
+    return {
+        "program": program_name,
+        "total_credits": find_total_credits(acalog_divs),
+        "categories": categorize_sections(walk_sections(acalog_divs)),
+    }
+
+def scrape_all_programs(program_ids=None, max_workers=DEFAULT_MAX_WORKERS, cache=None, offline=False,
+                        parser=DEFAULT_PARSER, only_core=True, parse_stats=None,
+                        previous=None, fingerprints=None, limiter=None, progress=None,
+                        catoid=CATALOG_ID):
+    """Scrape every program, returning results in program_ids order.
+
+    With a CrawlProgress, programs it already holds are returned without
+    fetching and every newly scraped program is recorded as it finishes.
+    """
+    program_ids = PROGRAM_IDS if program_ids is None else program_ids
+    previous = previous or {}
+    session = get_session(BASE_URL, pool_size=max_workers)
+
+    def scrape_one(item):
+        program_name, poid = item
+        finished = progress.get(program_name, poid) if progress is not None else None
+        if finished:
+            if "error" in finished:
+                return {"program": program_name, "error": finished["error"]}
+            if fingerprints is not None and finished["fingerprint"]:
+                fingerprints[program_name] = finished["fingerprint"]
+            return finished["requirements"]
 
-def main():
-    all_requirements = []
-    for program_name, poid in PROGRAM_IDS.items():
         print(f"Scraping {program_name}...")
-        data = scrape_program_requirements(program_name, poid)
-        all_requirements.append(data)
+        program_fingerprints = {}
+        try:
+            requirements = scrape_program_requirements(program_name, poid, session=session,
+                                                       cache=cache, offline=offline, parser=parser,
+                                                       only_core=only_core, parse_stats=parse_stats,
+                                                       previous=previous.get(program_name),
+                                                       fingerprints=program_fingerprints,
+                                                       limiter=limiter, catoid=catoid)
+        except requests.RequestException as e:
+            requirements = {"program": program_name, "error": f"Request failed: {e}"}
+
+        fingerprint = program_fingerprints.get(program_name)
+        if fingerprints is not None and fingerprint:
+            fingerprints[program_name] = fingerprint
+        if progress is not None:
+            progress.record(program_name, poid, requirements, fingerprint)
+        return requirements
+
+    if max_workers <= 1:
+        return [scrape_one(item) for item in program_ids.items()]
+
+    # executor.map yields in submission order, so output stays deterministic
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(scrape_one, program_ids.items()))
+
+def print_parse_report(parse_stats):
+    """Print per-page parse time and peak memory"""
+    print(f"{'Program':<32} {'Parser':<12} {'Page KiB':>9} {'Parse s':>8} {'Peak KiB':>9}")
+    for stats in parse_stats:
+        print(f"{stats['program']:<32} {stats['parser']:<12} {stats['page_bytes'] / 1024:>9.1f} "
+              f"{stats['parse_seconds']:>8.3f} {stats['peak_kib']:>9.1f}")
+
+def load_json(path, default):
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+def load_previous_run(output_dir):
+    """Pair last run's hashes with its requirements, keyed by program"""
+    state = load_json(os.path.join(output_dir, STATE_FILENAME), {})
+    results = load_json(os.path.join(output_dir, OUTPUT_FILENAME), [])
+    previous = {}
+    for requirements in results:
+        program_name = requirements.get("program")
+        if program_name in state and "error" not in requirements:
+            previous[program_name] = dict(state[program_name], requirements=requirements)
+    return previous, results
 
-    # Define the output directory and filename
-    output_dir = "app_data"
-    output_filename = "ecs_requirements_cleaned.json"
-    output_path = os.path.join(output_dir, output_filename)
+def diff_courses(old_courses, new_courses):
+    """Compare two course lists by code; a changed course kept its code but not its name"""
+    old_by_code = {}
+    for course in old_courses:
+        old_by_code.setdefault(course["code"], course)
+    new_by_code = {}
+    for course in new_courses:
+        new_by_code.setdefault(course["code"], course)
 
+    delta = {
+        "added": [code for code in new_by_code if code not in old_by_code],
+        "removed": [code for code in old_by_code if code not in new_by_code],
+        "changed": [
+            {"code": code, "before": old_by_code[code], "after": course}
+            for code, course in new_by_code.items()
+            if code in old_by_code and old_by_code[code] != course
+        ],
+    }
+    return {key: value for key, value in delta.items() if value}
+
+def compute_delta(old_results, new_results):
+    """List added, removed and changed courses per program and category"""
+    old_by_program = {r.get("program"): r for r in old_results}
+    new_by_program = {r.get("program"): r for r in new_results}
+    programs = {}
+    unchanged = []
+
+    for program_name, new in new_by_program.items():
+        old = old_by_program.get(program_name)
+        if old == new:
+            unchanged.append(program_name)
+            continue
+        old_categories = (old or {}).get("categories", {})
+        new_categories = new.get("categories", {})
+        categories = {}
+        for category in list(old_categories) + [c for c in new_categories if c not in old_categories]:
+            category_delta = diff_courses(old_categories.get(category, []), new_categories.get(category, []))
+            if category_delta:
+                categories[category] = category_delta
+        entry = {"status": "added" if old is None else "changed", "categories": categories}
+        for field in ("total_credits", "error"):
+            if (old or {}).get(field) != new.get(field):
+                entry[field] = {"before": (old or {}).get(field), "after": new.get(field)}
+        programs[program_name] = entry
+
+    for program_name, old in old_by_program.items():
+        if program_name not in new_by_program:
+            programs[program_name] = {
+                "status": "removed",
+                "categories": {category: {"removed": [c["code"] for c in courses]}
+                               for category, courses in old.get("categories", {}).items()},
+            }
+
+    return {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "programs": programs,
+        "unchanged": unchanged,
+    }
+
+def write_json(path, data, indent=2, separators=None):
+    """Write data to path atomically"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=indent, separators=separators)
+    os.replace(tmp_path, path)
+
+def build_course_index(all_requirements):
+    """Invert requirements into course code -> (program, category) references.
+
+    Program and category names are interned into lookup tables, and each
+    course maps to a flat [program_id, category_id, ...] list, keeping the
+    file compact and a lookup a single key access after loading.
+    """
+    programs = []
+    program_ids = {}
+    categories = []
+    category_ids = {}
+    courses = {}
+    seen = set()
+
+    for requirements in all_requirements:
+        program_name = requirements.get("program")
+        for category, category_courses in requirements.get("categories", {}).items():
+            for course in category_courses:
+                key = (course["code"], program_name, category)
+                if key in seen:
+                    continue
+                seen.add(key)
+                if program_name not in program_ids:
+                    program_ids[program_name] = len(programs)
+                    programs.append(program_name)
+                if category not in category_ids:
+                    category_ids[category] = len(categories)
+                    categories.append(category)
+                courses.setdefault(course["code"], []).extend(
+                    [program_ids[program_name], category_ids[category]])
+
+    return {
+        "version": COURSE_INDEX_VERSION,
+        "programs": programs,
+        "categories": categories,
+        "courses": courses,
+    }
+
+def load_course_index(path=os.path.join(OUTPUT_DIR, INDEX_FILENAME)):
+    """Load a course index as {code: [(program, category), ...]}"""
+    with open(path, "r") as f:
+        index = json.load(f)
+    if index.get("version") != COURSE_INDEX_VERSION:
+        raise ValueError(f"Unsupported course index version: {index.get('version')}")
+    programs = index["programs"]
+    categories = index["categories"]
+    return {
+        code: [(programs[refs[i]], categories[refs[i + 1]]) for i in range(0, len(refs), 2)]
+        for code, refs in index["courses"].items()
+    }
+
+def write_outputs(output_dir, previous_results, all_requirements, fingerprints, progress):
+    """Write the current catalog's requirements, course index, delta and state files"""
     # Ensure the output directory exists
     os.makedirs(output_dir, exist_ok=True)
 
+    delta = compute_delta(previous_results, all_requirements)
+    delta_path = os.path.join(output_dir, DELTA_FILENAME)
+    print(f"{len(delta['programs'])} programs changed, {len(delta['unchanged'])} unchanged. "
+          f"Saving delta to: {delta_path}")
+    write_json(delta_path, delta)
+
     # Write the file to the correct path
+    output_path = os.path.join(output_dir, OUTPUT_FILENAME)
     print(f"Saving requirements data to: {output_path}")
-    with open(output_path, "w") as f:
-        json.dump(all_requirements, f, indent=2)
+    write_json(output_path, all_requirements)
+
+    index_path = os.path.join(output_dir, INDEX_FILENAME)
+    index = build_course_index(all_requirements)
+    print(f"Saving index of {len(index['courses'])} courses to: {index_path}")
+    write_json(index_path, index, indent=None, separators=(",", ":"))
+
+    # Only programs scraped successfully this run keep their hashes
+    state = {name: fingerprints[name] for name in (r.get("program") for r in all_requirements)
+             if name in fingerprints}
+    write_json(os.path.join(output_dir, STATE_FILENAME), state)
+    # Keep the progress file while a failed program has attempts left, so --resume retries only those
+    if not any("error" in requirements and progress.retryable(requirements["program"])
+               for requirements in all_requirements):
+        progress.clear()
+
+def main(max_workers=DEFAULT_MAX_WORKERS, cache_dir=DEFAULT_CACHE_DIR,
+         cache_max_bytes=DEFAULT_MAX_BYTES, offline=False,
+         parser=DEFAULT_PARSER, only_core=True, report_parse=False,
+         incremental=True, output_dir=OUTPUT_DIR,
+         enrich=False, enrich_workers=DEFAULT_ENRICH_WORKERS,
+         discover=False, index_urls=None, resume=False,
+         years=None, store_path=DEFAULT_STORE_PATH):
+    """Scrape one or more catalog years.
+
+    The current catalog year keeps the flat requirements, delta and state
+    files under output_dir; every scraped year is also saved to the
+    versioned catalog store. Returns the current year's requirements, or the
+    last year scraped when the current year was not requested.
+    """
+    years = years or [CURRENT_CATALOG_YEAR]
+    unknown = [year for year in years if year not in CATALOG_YEARS]
+    if unknown:
+        raise ValueError(f"Unknown catalog year(s): {', '.join(unknown)}")
+    cache = ResponseCache(cache_dir, max_bytes=cache_max_bytes) if cache_dir else None
+    if offline and cache is None:
+        raise ValueError("Offline mode requires a response cache")
+
+    # Crawling whole catalogs goes through the adaptive limiter to stay polite
+    crawling = discover or any(CATALOG_YEARS[year] != CATALOG_ID for year in years)
+    limiter = AdaptiveRateLimiter(initial=min(2, max_workers), maximum=max(max_workers, 1)) if crawling else None
+    session = get_session(BASE_URL, pool_size=max(max_workers, enrich_workers))
+    store = CatalogStore(store_path) if store_path else None
+
+    current_requirements = None
+    all_requirements = []
+    for year in years:
+        catoid = CATALOG_YEARS[year]
+        is_current = catoid == CATALOG_ID
+        print(f"Scraping {year} catalog (catoid={catoid})...")
+        program_ids = programs_for_catalog(catoid, discover=discover, index_urls=index_urls, session=session,
+                                           cache=cache, offline=offline, limiter=limiter, parser=parser)
+
+        # Incremental state, deltas and resumable progress are kept for the current catalog
+        previous, previous_results = load_previous_run(output_dir) if is_current else ({}, [])
+        progress = CrawlProgress(os.path.join(output_dir, PROGRESS_FILENAME), resume=resume) if is_current else None
+        if progress is not None and progress.done:
+            print(f"Resuming crawl: {len(progress.done)} programs already finished")
+        fingerprints = {}
+        parse_stats = [] if report_parse else None
+        all_requirements = scrape_all_programs(program_ids, max_workers=max_workers, cache=cache, offline=offline,
+                                               parser=parser, only_core=only_core, parse_stats=parse_stats,
+                                               previous=previous if incremental else None,
+                                               fingerprints=fingerprints, limiter=limiter, progress=progress,
+                                               catoid=catoid)
+        if report_parse:
+            order = {name: i for i, name in enumerate(program_ids)}
+            print_parse_report(sorted(parse_stats, key=lambda stats: order.get(stats["program"], len(order))))
+
+        if enrich:
+            fetched = enrich_requirements(
+                all_requirements,
+                {name: refs.get("course_refs", {}) for name, refs in fingerprints.items()},
+                lambda url: fetch_page(url, session=session, cache=cache, offline=offline, limiter=limiter),
+                max_workers=enrich_workers,
+                parser=resolve_parser(parser),
+            )
+            print(f"Enriched courses from {fetched} distinct course pages")
+
+        if is_current:
+            write_outputs(output_dir, previous_results, all_requirements, fingerprints, progress)
+            current_requirements = all_requirements
+        if store is not None:
+            store.save_catalog(year, catoid, all_requirements)
+
+    if limiter is not None:
+        print(f"Rate limiter: {limiter.snapshot()}")
+    if store is not None:
+        print(f"Catalog store {store.path}: {store.stats()}")
+        store.close()
+    if cache is not None:
+        cache.close()
+
+    return current_requirements if current_requirements is not None else all_requirements
 
-    return all_requirements
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape ECS program requirements from the course catalog")
+    parser.add_argument("--workers", type=int, default=DEFAULT_MAX_WORKERS,
+                        help="number of programs to fetch concurrently (1 = serial)")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR,
+                        help="directory for the on-disk response cache")
+    parser.add_argument("--cache-max-mb", type=float, default=DEFAULT_MAX_BYTES / (1024 * 1024),
+                        help="evict least recently used pages beyond this size")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="always download full pages without caching")
+    parser.add_argument("--offline", action="store_true",
+                        help="serve pages only from the cache, never the network")
+    parser.add_argument("--parser", default=DEFAULT_PARSER,
+                        help='BeautifulSoup tree builder ("auto" prefers lxml, else html.parser)')
+    parser.add_argument("--full-page", action="store_true",
+                        help="parse the whole page instead of only the acalog-core blocks")
+    parser.add_argument("--report-parse", action="store_true",
+                        help="print per-page parse time and peak memory")
+    parser.add_argument("--full-refresh", action="store_true",
+                        help="re-extract every program even if its page content is unchanged")
+    parser.add_argument("--output-dir", default=OUTPUT_DIR,
+                        help="directory for the requirements, state and delta files")
+    parser.add_argument("--enrich", action="store_true",
+                        help="fetch linked course pages for titles, credits and prerequisites")
+    parser.add_argument("--enrich-workers", type=int, default=DEFAULT_ENRICH_WORKERS,
+                        help="number of course pages to fetch concurrently")
+    parser.add_argument("--discover", action="store_true",
+                        help="scrape every program linked from the catalog index instead of PROGRAM_IDS")
+    parser.add_argument("--index-url", action="append", dest="index_urls",
+                        help="catalog index page to discover programs from (repeatable)")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue an interrupted crawl without refetching finished programs")
+    parser.add_argument("--year", action="append", dest="years", choices=list(CATALOG_YEARS),
+                        help=f"catalog year to scrape (repeatable, default {CURRENT_CATALOG_YEAR})")
+    parser.add_argument("--store", default=DEFAULT_STORE_PATH,
+                        help="versioned catalog store that every scraped year is saved to")
+    parser.add_argument("--no-store", action="store_true",
+                        help="do not save results to the versioned catalog store")
+    return parser.parse_args(argv)
 
 if __name__ == "__main__":
-    requirements = main()
+    args = parse_args()
+    requirements = main(max_workers=args.workers,
+                        cache_dir=None if args.no_cache else args.cache_dir,
+                        cache_max_bytes=int(args.cache_max_mb * 1024 * 1024),
+                        offline=args.offline,
+                        parser=args.parser,
+                        only_core=not args.full_page,
+                        report_parse=args.report_parse,
+                        incremental=not args.full_refresh,
+                        output_dir=args.output_dir,
+                        enrich=args.enrich,
+                        enrich_workers=args.enrich_workers,
+                        discover=args.discover,
+                        index_urls=args.index_urls,
+                        resume=args.resume,
+                        years=args.years,
+                        store_path=None if args.no_store else args.store)
     print(json.dumps(requirements, indent=2))
 
 
@@ -0,0 +1,201 @@
+import requests
+import hashlib
+import atexit
+import threading
+import json
+import time
+import os
+
+DEFAULT_CACHE_DIR = os.path.join("app_data", "http_cache")
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+INDEX_FILENAME = "index.json"
+# index.json is rewritten after this many new or revalidated entries
+INDEX_SAVE_EVERY = 50
+
+
+class CacheMissError(requests.RequestException):
+    """Raised in offline mode when a URL has no cached copy"""
+
+
+class CachedResponse:
+    """Minimal response object returned by ResponseCache.fetch"""
+
+    def __init__(self, url, status_code, content, from_cache):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.from_cache = from_cache
+
+
+class ResponseCache:
+    """Persistent, size-bounded HTTP response cache keyed by URL.
+
+    Bodies are stored one file per URL next to an index.json that records the
+    ETag/Last-Modified validators, body size and last access time. Cached
+    entries are revalidated with conditional GETs; once the stored bodies
+    exceed max_bytes the least recently used entries are evicted.
+
+    The index lives in memory: a cache hit only updates it there, and it is
+    written out when entries are evicted, every INDEX_SAVE_EVERY changes and
+    on close() (also registered with atexit).
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._index = self._load_index()
+        self._total = sum(entry["size"] for entry in self._index.values())
+        self._changes = 0
+        self._dirty = False
+        atexit.register(self.close)
+
+    def _index_path(self):
+        return os.path.join(self.cache_dir, INDEX_FILENAME)
+
+    def _body_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.body")
+
+    @staticmethod
+    def _key(url):
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _load_index(self):
+        try:
+            with open(self._index_path(), "r") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        # Drop entries whose body file has gone missing
+        return {url: entry for url, entry in index.items()
+                if os.path.exists(self._body_path(entry["key"]))}
+
+    def _save_index(self):
+        tmp_path = self._index_path() + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, self._index_path())
+        self._changes = 0
+        self._dirty = False
+
+    def _changed(self):
+        # Called under the lock after an entry was added or revalidated
+        self._dirty = True
+        self._changes += 1
+        if self._changes >= INDEX_SAVE_EVERY:
+            self._save_index()
+
+    def _evict(self):
+        """Drop least recently used bodies until under max_bytes; True if any were removed"""
+        if self._total <= self.max_bytes:
+            return False
+        for url, entry in sorted(self._index.items(), key=lambda item: item[1]["last_access"]):
+            if self._total <= self.max_bytes:
+                break
+            try:
+                os.remove(self._body_path(entry["key"]))
+            except OSError:
+                pass
+            self._total -= entry["size"]
+            del self._index[url]
+        return True
+
+    def close(self):
+        """Write the index if it changed since it was last saved"""
+        with self._lock:
+            if self._dirty:
+                self._save_index()
+
+    def get(self, url):
+        """Return the cached body for url, or None"""
+        with self._lock:
+            entry = self._index.get(url)
+            if entry is None:
+                return None
+            try:
+                with open(self._body_path(entry["key"]), "rb") as f:
+                    return f.read()
+            except OSError:
+                self._total -= self._index.pop(url)["size"]
+                self._dirty = True
+                return None
+
+    def store(self, url, content, etag=None, last_modified=None):
+        key = self._key(url)
+        # The body is written outside the lock; a per-thread temp file keeps concurrent writers apart
+        tmp_path = f"{self._body_path(key)}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+        with self._lock:
+            os.replace(tmp_path, self._body_path(key))
+            previous = self._index.get(url)
+            if previous is not None:
+                self._total -= previous["size"]
+            self._total += len(content)
+            self._index[url] = {
+                "key": key,
+                "etag": etag,
+                "last_modified": last_modified,
+                "size": len(content),
+                "last_access": time.time(),
+            }
+            if self._evict():
+                self._save_index()
+            else:
+                self._changed()
+
+    def _touch(self, url, etag=None, last_modified=None):
+        with self._lock:
+            entry = self._index.get(url)
+            if entry is None:
+                return
+            entry["last_access"] = time.time()
+            self._dirty = True
+            if (etag and entry.get("etag") != etag) or (last_modified and entry.get("last_modified") != last_modified):
+                entry["etag"] = etag or entry.get("etag")
+                entry["last_modified"] = last_modified or entry.get("last_modified")
+                self._changed()
+
+    def _conditional_headers(self, url):
+        with self._lock:
+            entry = self._index.get(url)
+            if entry is None:
+                return {}
+            headers = {}
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+            return headers
+
+    def fetch(self, session, url, offline=False, timeout=None):
+        """GET url through the cache.
+
+        Online, a cached URL is revalidated with a conditional GET and its
+        stored body is reused on 304. Offline, only cached bodies are served
+        and a miss raises CacheMissError.
+        """
+        if offline:
+            content = self.get(url)
+            if content is None:
+                raise CacheMissError(f"No cached copy of {url} (offline mode)")
+            self._touch(url)
+            return CachedResponse(url, 200, content, from_cache=True)
+
+        headers = self._conditional_headers(url)
+        response = session.get(url, headers=headers, timeout=timeout)
+
+        if response.status_code == 304:
+            content = self.get(url)
+            if content is not None:
+                self._touch(url, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+                return CachedResponse(url, 200, content, from_cache=True)
+            # Body vanished between revalidation and read; fetch it fresh
+            response = session.get(url, timeout=timeout)
+
+        if response.status_code == 200:
+            self.store(url, response.content,
+                       etag=response.headers.get("ETag"),
+                       last_modified=response.headers.get("Last-Modified"))
+        return CachedResponse(url, response.status_code, response.content, from_cache=False)
@@ -0,0 +1,146 @@
+from collections import namedtuple
+from html.parser import HTMLParser
+from enum import Enum
+import re
+
+
+class PageState(Enum):
+    SAML = "saml"
+    ERROR = "error"
+    SESSION_TIMEOUT = "session_timeout"
+    COURSE_HISTORY = "course_history"
+    DASHBOARD = "dashboard"
+    TWO_FACTOR = "two_factor"
+    LOGIN = "login"
+    UNKNOWN = "unknown"
+
+
+LOGGED_IN_STATES = {PageState.COURSE_HISTORY, PageState.DASHBOARD}
+FAILURE_STATES = {PageState.ERROR, PageState.SESSION_TIMEOUT}
+
+# Known page signatures. Patterns must stay valid in both Python and
+# JavaScript and must not contain capturing groups. Markup signatures are
+# matched against the page HTML; text signatures only against the visible
+# text, since words like "Duo" also turn up inside scripts and inlined fonts.
+SIGNATURES = [
+    (PageState.ERROR, r"An error has occurred that has stopped this transaction from continuing"),
+    (PageState.SESSION_TIMEOUT, r"Your session has timed out|Session expired|Invalid session|Please log in again"),
+    (PageState.COURSE_HISTORY, r"id=\"CRSE_NAME\$|SSS_MY_CRSEHIST"),
+    (PageState.DASHBOARD, r"id=\"(?:ptifrmtgtframe|pthdr2container|win0divPTNUI_LAND_REC_GROUPLET\$0)\""),
+    (PageState.LOGIN, r"id=\"(?:userid|login)\""),
+]
+TEXT_SIGNATURES = [
+    (PageState.LOGIN, r"\bSign [Ii]n to your account\b|\bUser ID\b"),
+    (PageState.TWO_FACTOR, r"Duo Security|Duo Push|\b[Tt]wo-[Ff]actor [Aa]uthentication\b|\b[Vv]erification code\b|"
+                           r"\b[Ss]ecurity code\b|Enter (?:the|your) passcode|\bSend Me a Push\b"),
+]
+# When several signatures match, the earliest state in this order wins; a
+# URL containing "login" counts as LOGIN and so also beats TWO_FACTOR
+PRIORITY = [PageState.SAML, PageState.ERROR, PageState.SESSION_TIMEOUT, PageState.COURSE_HISTORY,
+            PageState.DASHBOARD, PageState.LOGIN, PageState.TWO_FACTOR, PageState.UNKNOWN]
+
+SIGNATURE_RE = re.compile("|".join(f"(?P<{state.name}>{pattern})" for state, pattern in SIGNATURES))
+TEXT_SIGNATURE_RE = re.compile("|".join(f"(?P<{state.name}>{pattern})" for state, pattern in TEXT_SIGNATURES))
+# Literal fragments of the text signatures; markup with none of them cannot match
+TEXT_HINTS = ["Duo Security", "Duo Push", "actor", "erification code", "ecurity code", "passcode",
+              "Send Me a Push", "to your account", "User ID"]
+# Elements whose content never shows up as page text
+HIDDEN_TAGS = {"script", "style", "noscript", "template", "head"}
+
+# In-browser version of the same pass: returns the matched state names and
+# their first matching text, so only a few bytes cross the WebDriver wire
+CLASSIFY_SCRIPT = """
+const [names, patterns, textNames, textPatterns] = arguments;
+const found = {};
+const scan = (source, names, patterns) => {
+    const combined = new RegExp(patterns.map((p) => '(' + p + ')').join('|'), 'g');
+    const seen = {};
+    for (const match of source.matchAll(combined)) {
+        const index = match.slice(1).findIndex((group) => group !== undefined);
+        if (!(names[index] in seen)) seen[names[index]] = match[0];
+        if (!(names[index] in found)) found[names[index]] = match[0];
+        if (Object.keys(seen).length === names.length) break;
+    }
+};
+scan(document.documentElement ? document.documentElement.outerHTML : '', names, patterns);
+scan(document.body ? document.body.innerText : '', textNames, textPatterns);
+return found;
+"""
+
+PageStatus = namedtuple("PageStatus", ["state", "detail"])
+
+
+class VisibleTextParser(HTMLParser):
+    """Collects text nodes outside scripts, styles and the head, like innerText"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self._hidden = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in HIDDEN_TAGS:
+            self._hidden += 1
+
+    def handle_endtag(self, tag):
+        if tag in HIDDEN_TAGS and self._hidden:
+            self._hidden -= 1
+
+    def handle_data(self, data):
+        if not self._hidden:
+            self.parts.append(data)
+
+
+def visible_text(html):
+    parser = VisibleTextParser()
+    parser.feed(html)
+    parser.close()
+    return " ".join(parser.parts)
+
+
+def _resolve(found, url):
+    """Pick the winning state from {state: matched text} and the page URL"""
+    url = (url or "").lower()
+    if "saml" in url:
+        return PageStatus(PageState.SAML, url)
+    for state in PRIORITY:
+        if state == PageState.TWO_FACTOR and "login" in url:
+            return PageStatus(PageState.LOGIN, url)
+        if state in found:
+            return PageStatus(state, found[state])
+    return PageStatus(PageState.UNKNOWN, None)
+
+
+def _scan(pattern, text, found, total):
+    matched = set()
+    for match in pattern.finditer(text):
+        state = PageState[match.lastgroup]
+        matched.add(state)
+        found.setdefault(state, match.group())
+        if len(matched) == total:
+            break
+
+
+def classify_page(html, url=""):
+    """Classify page HTML in one pass over the markup and one over the visible text"""
+    if isinstance(html, bytes):
+        html = html.decode("utf-8", errors="replace")
+    found = {}
+    _scan(SIGNATURE_RE, html, found, len(SIGNATURES))
+    # Only pages whose markup could contain a text signature pay for extracting the text
+    if any(hint in html for hint in TEXT_HINTS):
+        _scan(TEXT_SIGNATURE_RE, visible_text(html), found, len(TEXT_SIGNATURES))
+    return _resolve(found, url)
+
+
+def classify_driver(driver):
+    """Classify the browser's current page, matching inside the browser when possible"""
+    try:
+        found = driver.execute_script(CLASSIFY_SCRIPT, [state.name for state, _ in SIGNATURES],
+                                      [pattern for _, pattern in SIGNATURES],
+                                      [state.name for state, _ in TEXT_SIGNATURES],
+                                      [pattern for _, pattern in TEXT_SIGNATURES])
+        return _resolve({PageState[name]: text for name, text in (found or {}).items()}, driver.current_url)
+    except Exception:
+        # Fall back to a single page_source transfer
+        return classify_page(driver.page_source, driver.current_url)
@@ -0,0 +1,84 @@
+"""Browser-free extraction of the rows of a classic PeopleSoft page.
+
+    python peoplesoft_grid_parser.py "Grades.html"
+
+Classic components (Grades, Academic Program, Transfer Credit, ...) render
+every grid cell as an element whose id is FIELD$n, n being the row. One
+streaming pass collects those cells and groups them by row, the same way
+the Course History parser pairs CRSE_NAME$n with the other $n fields.
+"""
+from html.parser import HTMLParser
+import argparse
+import json
+import re
+
+CELL_ID = re.compile(r"^([A-Z][A-Z0-9_]*)\$(\d+)$")
+CELL_TAGS = {"span", "a"}
+
+
+class GridCellParser(HTMLParser):
+    """Collects the text of every FIELD$n cell as rows[n][FIELD]"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.rows = {}
+        self._cell = None
+        self._depth = 0
+        self._text = []
+
+    def handle_starttag(self, tag, attrs):
+        if self._cell is not None:
+            if tag == self._cell[2]:
+                self._depth += 1
+            return
+        if tag not in CELL_TAGS:
+            return
+        match = CELL_ID.match(dict(attrs).get("id") or "")
+        if match:
+            self._cell = (match.group(1), int(match.group(2)), tag)
+            self._depth = 1
+            self._text = []
+
+    def handle_endtag(self, tag):
+        if self._cell is None or tag != self._cell[2]:
+            return
+        self._depth -= 1
+        if self._depth:
+            return
+        field, row, _ = self._cell
+        text = " ".join("".join(self._text).split())
+        if text:
+            self.rows.setdefault(row, {}).setdefault(field, text)
+        self._cell = None
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._text.append(data)
+
+
+def parse_grid_html(html):
+    """Return the page's grid rows as {FIELD: text} dicts, in row order"""
+    if isinstance(html, bytes):
+        html = html.decode("utf-8", errors="replace")
+    parser = GridCellParser()
+    parser.feed(html)
+    parser.close()
+    return [parser.rows[row] for row in sorted(parser.rows)]
+
+
+def is_component_page(component):
+    """Page check for one component, e.g. "SSR_SSENRL_GRADE.GBL" """
+    marker = component.encode()
+
+    def check(html):
+        return marker in html if isinstance(html, bytes) else component in html
+    return check
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="List the grid rows of saved PeopleSoft pages")
+    parser.add_argument("pages", nargs="+", help="saved PeopleSoft HTML files")
+    args = parser.parse_args()
+    for page in args.pages:
+        with open(page, "rb") as f:
+            print(json.dumps({page: parse_grid_html(f.read())}, indent=2))
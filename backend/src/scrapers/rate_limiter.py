@@ -0,0 +1,82 @@
+import threading
+import time
+
+
+class AdaptiveRateLimiter:
+    """Polite concurrency limiter that adapts to observed latency and errors.
+
+    Uses additive-increase/multiplicative-decrease: every run of healthy,
+    fast responses lets one more request run at a time, while an error or a
+    response slower than slow_latency halves the concurrency and widens the
+    minimum spacing between request starts.
+    """
+
+    def __init__(self, initial=2, minimum=1, maximum=8, min_interval=0.25,
+                 target_latency=2.0, slow_latency=6.0, increase_every=5):
+        self.limit = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.base_interval = min_interval
+        self.min_interval = min_interval
+        self.target_latency = target_latency
+        self.slow_latency = slow_latency
+        self.increase_every = increase_every
+        self.in_flight = 0
+        self.requests = 0
+        self.errors = 0
+        self._healthy_streak = 0
+        self._last_start = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while True:
+                if self.in_flight < self.limit:
+                    wait = self._last_start + self.min_interval - time.monotonic()
+                    if wait <= 0:
+                        break
+                    self._cond.wait(wait)
+                else:
+                    self._cond.wait()
+            self.in_flight += 1
+            self._last_start = time.monotonic()
+
+    def release(self, latency, ok=True):
+        with self._cond:
+            self.in_flight -= 1
+            self.requests += 1
+            if not ok:
+                self.errors += 1
+            if not ok or latency > self.slow_latency:
+                self.limit = max(self.minimum, self.limit // 2)
+                self.min_interval = min(self.min_interval * 2, 10.0)
+                self._healthy_streak = 0
+            elif latency <= self.target_latency:
+                self._healthy_streak += 1
+                self.min_interval = max(self.base_interval, self.min_interval * 0.75)
+                if self._healthy_streak >= self.increase_every:
+                    self.limit = min(self.maximum, self.limit + 1)
+                    self._healthy_streak = 0
+            self._cond.notify_all()
+
+    def call(self, func, *args, **kwargs):
+        """Run func under the limiter, treating exceptions and 429/5xx responses as errors"""
+        self.acquire()
+        start = time.monotonic()
+        ok = False
+        try:
+            result = func(*args, **kwargs)
+            status = getattr(result, "status_code", 200)
+            ok = status != 429 and status < 500
+            return result
+        finally:
+            self.release(time.monotonic() - start, ok=ok)
+
+    def snapshot(self):
+        with self._cond:
+            return {
+                "limit": self.limit,
+                "min_interval": round(self.min_interval, 3),
+                "requests": self.requests,
+                "errors": self.errors,
+            }
@@ -0,0 +1,166 @@
+"""Timing spans for the MySlice scrape, written as JSON lines.
+
+    SCRAPER_SPANS=1 python ScrapeCourses.py
+    python scrape_metrics.py app_data/scrape_spans.jsonl
+
+Each finished run appends one line per span (run id, span name, parent,
+duration, error) to the spans file; running this module aggregates every
+run in the file into count, p50, p95 and max per span. When spans are
+disabled, span() hands back a shared no-op context manager and traced()
+calls straight through, so instrumented code pays one flag check.
+"""
+from functools import wraps
+import statistics
+import threading
+import argparse
+import json
+import time
+import uuid
+import os
+
+ENABLED = os.environ.get("SCRAPER_SPANS", "0") == "1"
+SPANS_FILE = os.environ.get("SCRAPER_SPANS_FILE", os.path.join("app_data", "scrape_spans.jsonl"))
+
+_local = threading.local()
+_write_lock = threading.Lock()
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Span:
+    __slots__ = ("run", "name", "attrs", "start", "parent")
+
+    def __init__(self, run, name, attrs):
+        self.run = run
+        self.name = name
+        self.attrs = attrs
+
+    def __enter__(self):
+        stack = self.run["stack"]
+        self.parent = stack[-1] if stack else None
+        stack.append(self.name)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        self.run["stack"].pop()
+        record = {"span": self.name, "parent": self.parent, "ms": round(elapsed * 1000, 3)}
+        if exc_type is not None:
+            record["error"] = exc_type.__name__
+        if self.attrs:
+            record.update(self.attrs)
+        self.run["spans"].append(record)
+        return False
+
+
+def enable(path=None):
+    global ENABLED, SPANS_FILE
+    ENABLED = True
+    if path:
+        SPANS_FILE = path
+
+
+def disable():
+    global ENABLED
+    ENABLED = False
+
+
+def span(name, **attrs):
+    """Time the enclosed block as one span of the current run"""
+    if not ENABLED:
+        return NULL_SPAN
+    run = getattr(_local, "run", None)
+    if run is None:
+        return NULL_SPAN
+    return Span(run, name, attrs)
+
+
+def traced(name):
+    """Decorator form of span() for whole functions"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return func(*args, **kwargs)
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def start_run(**attrs):
+    """Begin collecting spans for a run on this thread"""
+    if not ENABLED:
+        return
+    _local.run = {"run_id": uuid.uuid4().hex, "started": time.time(), "attrs": attrs,
+                  "spans": [], "stack": [], "t0": time.perf_counter()}
+
+
+def finish_run(outcome):
+    """Append this thread's spans, plus a total 'run' span, to the spans file"""
+    run = getattr(_local, "run", None)
+    _local.run = None
+    if not ENABLED or run is None:
+        return None
+    run["spans"].append({"span": "run", "parent": None, "outcome": outcome,
+                         "ms": round((time.perf_counter() - run["t0"]) * 1000, 3)})
+    base = {"run_id": run["run_id"], "ts": round(run["started"], 3), **run["attrs"]}
+    lines = "".join(json.dumps({**base, **record}) + "\n" for record in run["spans"])
+    os.makedirs(os.path.dirname(SPANS_FILE) or ".", exist_ok=True)
+    with _write_lock, open(SPANS_FILE, "a") as f:
+        f.write(lines)
+    return run["run_id"]
+
+
+def aggregate(path=None):
+    """Return {span: {count, errors, p50_ms, p95_ms, max_ms}} across every run in the file"""
+    durations = {}
+    errors = {}
+    with open(path or SPANS_FILE, "r") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            durations.setdefault(record["span"], []).append(record["ms"])
+            if record.get("error"):
+                errors[record["span"]] = errors.get(record["span"], 0) + 1
+    summary = {}
+    for name, values in durations.items():
+        values.sort()
+        summary[name] = {
+            "count": len(values),
+            "errors": errors.get(name, 0),
+            "p50_ms": round(statistics.median(values), 1),
+            "p95_ms": round(values[min(len(values) - 1, int(len(values) * 0.95))], 1),
+            "max_ms": round(values[-1], 1),
+        }
+    return summary
+
+
+def print_summary(summary):
+    print(f"{'Span':<28} {'Count':>6} {'Errors':>6} {'p50 ms':>10} {'p95 ms':>10} {'Max ms':>10}")
+    for name, stats in sorted(summary.items(), key=lambda item: item[1]["p50_ms"] * item[1]["count"], reverse=True):
+        print(f"{name:<28} {stats['count']:>6} {stats['errors']:>6} {stats['p50_ms']:>10.1f} "
+              f"{stats['p95_ms']:>10.1f} {stats['max_ms']:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Aggregate scrape timing spans")
+    parser.add_argument("path", nargs="?", default=SPANS_FILE)
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = parser.parse_args()
+    summary = aggregate(args.path)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print_summary(summary)
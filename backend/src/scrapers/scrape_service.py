@@ -0,0 +1,216 @@
+from collections import deque
+import ScrapeCourses as scraper
+import statistics
+import shutil
+import threading
+import queue
+import time
+import uuid
+import os
+
+DEFAULT_JOBS_DIR = os.path.join("app_data", "scrape_jobs")
+DEFAULT_WORKERS = 2
+DEFAULT_MAX_QUEUE = 20
+# Throughput is reported over this trailing window
+THROUGHPUT_WINDOW = 300
+# Latency percentiles cover this many most recent jobs
+METRIC_SAMPLES = 1000
+# Finished jobs nobody collected through on_done stay queryable this long
+FINISHED_JOB_TTL = 15 * 60
+
+
+class QueueFullError(Exception):
+    """Raised by submit when the bounded job queue is already full"""
+
+
+def percentiles(values):
+    if not values:
+        return None
+    values = sorted(values)
+    return {
+        "p50": round(statistics.median(values), 3),
+        "p95": round(values[min(len(values) - 1, int(len(values) * 0.95))], 3),
+        "max": round(values[-1], 3),
+    }
+
+
+class ScrapeJob:
+    """One user's scrape request and, once finished, its result"""
+
+    def __init__(self, job_id, workdir, cookie_file=None, username=None, password=None,
+                 on_course=None, on_done=None):
+        self.id = job_id
+        self.workdir = workdir
+        self.cookie_file = cookie_file
+        self.username = username
+        self.password = password
+        self.on_course = on_course
+        self.on_done = on_done
+        self.status = "queued"
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._done = threading.Event()
+
+    def wait(self, timeout=None):
+        """Block until the job finishes and return its result"""
+        self._done.wait(timeout)
+        return self.result
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "status": self.status,
+            "workdir": self.workdir,
+            "submitted_at": self.submitted_at,
+            "queue_seconds": round(self.started_at - self.submitted_at, 3) if self.started_at else None,
+            "run_seconds": round(self.finished_at - self.started_at, 3) if self.finished_at else None,
+            "error": self.error,
+            "result": self.result,
+        }
+
+
+class ScrapeService:
+    """Runs scrape_user_courses jobs on a fixed set of worker threads.
+
+    Every job gets its own working directory (diagnostics, output files)
+    and its user's stored session through ScrapeCourses.job_context, and
+    its result is kept on the job object. The queue is bounded: submit
+    raises QueueFullError instead of letting a spike pile up unbounded work.
+
+    So a long-lived service does not grow with every job, finished jobs
+    are forgotten once on_done has delivered them (or after job_ttl),
+    latency samples are capped and successful jobs' directories are
+    removed unless keep_workdirs is set; failed ones keep their diagnostics.
+    """
+
+    def __init__(self, workers=DEFAULT_WORKERS, max_queue=DEFAULT_MAX_QUEUE,
+                 jobs_dir=DEFAULT_JOBS_DIR, browser_pool=None, job_ttl=FINISHED_JOB_TTL, keep_workdirs=False):
+        self.jobs_dir = jobs_dir
+        self.job_ttl = job_ttl
+        self.keep_workdirs = keep_workdirs
+        self.browser_pool = browser_pool if browser_pool is not None else scraper.get_browser_pool(warm=False)
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._running = 0
+        self._rejected = 0
+        self._done = 0
+        self._failed = 0
+        self._queue_seconds = deque(maxlen=METRIC_SAMPLES)
+        self._run_seconds = deque(maxlen=METRIC_SAMPLES)
+        self._finished_at = deque(maxlen=METRIC_SAMPLES)
+        self._started = time.time()
+        self._workers = [threading.Thread(target=self._work, name=f"scrape-worker-{i}", daemon=True)
+                         for i in range(workers)]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, username=None, password=None, cookie_file=None, job_id=None, on_course=None, on_done=None):
+        """Queue a scrape and return its job, or raise QueueFullError.
+
+        on_course is called with each course as the worker extracts it and
+        on_done with the job once it has finished, both on the worker thread.
+        """
+        job_id = job_id or uuid.uuid4().hex
+        job = ScrapeJob(job_id, os.path.join(self.jobs_dir, job_id), cookie_file, username, password,
+                        on_course, on_done)
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                self._rejected += 1
+            raise QueueFullError(f"Scrape queue is full ({self._queue.maxsize} jobs waiting)")
+        with self._lock:
+            self._prune()
+            self._jobs[job_id] = job
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            self._prune()
+            return self._jobs.get(job_id)
+
+    def _prune(self):
+        """Forget finished jobs older than job_ttl; callers hold the lock"""
+        cutoff = time.time() - self.job_ttl
+        for job_id in [job_id for job_id, job in self._jobs.items()
+                       if job.finished_at is not None and job.finished_at < cutoff]:
+            del self._jobs[job_id]
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                self._queue.task_done()
+                return
+            job.started_at = time.time()
+            job.status = "running"
+            with self._lock:
+                self._running += 1
+            try:
+                with scraper.job_context(job.workdir, job.cookie_file, user=job.username):
+                    job.result = scraper.scrape_user_courses(
+                        interactive=False, username=job.username, password=job.password,
+                        browser_pool=self.browser_pool, on_course=job.on_course)
+                job.status = "done" if job.result and job.result.get("success") else "failed"
+            except Exception as e:
+                job.error = str(e)
+                job.status = "failed"
+            finally:
+                job.password = None
+                job.finished_at = time.time()
+                with self._lock:
+                    self._running -= 1
+                    if job.status == "done":
+                        self._done += 1
+                    else:
+                        self._failed += 1
+                    self._queue_seconds.append(job.started_at - job.submitted_at)
+                    self._run_seconds.append(job.finished_at - job.started_at)
+                    self._finished_at.append(job.finished_at)
+                if job.status == "done" and not self.keep_workdirs:
+                    shutil.rmtree(job.workdir, ignore_errors=True)
+                job._done.set()
+                if job.on_done is not None:
+                    try:
+                        job.on_done(job)
+                    except Exception as e:
+                        print(f"⚠️ on_done callback for job {job.id} failed: {e}")
+                    # Delivered: the caller holds the job now
+                    with self._lock:
+                        self._jobs.pop(job.id, None)
+                self._queue.task_done()
+
+    def metrics(self):
+        """Queue depth, queue latency, run time and throughput so far"""
+        now = time.time()
+        with self._lock:
+            recent = [t for t in self._finished_at if t >= now - THROUGHPUT_WINDOW]
+            window = min(THROUGHPUT_WINDOW, now - self._started) or 1
+            self._prune()
+            return {
+                "workers": len(self._workers),
+                "queued": self._queue.qsize(),
+                "max_queue": self._queue.maxsize,
+                "running": self._running,
+                "done": self._done,
+                "failed": self._failed,
+                "tracked_jobs": len(self._jobs),
+                "rejected": self._rejected,
+                "queue_seconds": percentiles(self._queue_seconds),
+                "run_seconds": percentiles(self._run_seconds),
+                "jobs_per_minute": round(len(recent) * 60 / window, 2),
+                "browser_pool": self.browser_pool.stats(),
+            }
+
+    def shutdown(self, wait=True):
+        """Stop the workers once the jobs already queued have run"""
+        for _ in self._workers:
+            self._queue.put(None)
+        if wait:
+            for worker in self._workers:
+                worker.join()
+        self.browser_pool.close()
@@ -0,0 +1,184 @@
+"""Long-running scrape worker speaking JSON lines over stdin/stdout.
+
+    python scrape_worker.py [--workers 2] [--max-queue 20] [--warm-browsers]
+
+Each stdin line is a request with an "id" and an "op":
+
+    {"id": "1", "op": "scrape", "username": "...", "password": "...", "stream": true}
+    {"id": "2", "op": "parse", "path": "course_history.html"}
+    {"id": "3", "op": "requirements", "codes": ["CIS 151"]}
+    {"id": "4", "op": "health"}
+    {"id": "5", "op": "shutdown"}
+
+Every stdout line is a response carrying the request's id and a "type":
+"accepted", "course" (streamed scrape rows), "result", "health" or
+"error". Scrapes run on ScrapeService's worker threads and parses on a
+small thread pool, so several requests can be in flight; responses may
+arrive in any order. Modules, the pooled HTTP adapter, the browser pool and
+the course requirement index stay loaded between requests. Log output goes
+to stderr.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from scrape_service import ScrapeService, QueueFullError, DEFAULT_WORKERS, DEFAULT_MAX_QUEUE
+from course_history_parser import parse_course_history_html, parse_course_history_file, unique_courses
+from course_stream import stdout_stream
+import threading
+import argparse
+import json
+import time
+import uuid
+import sys
+import os
+
+DEFAULT_PARSE_WORKERS = 2
+
+
+class ScrapeWorker:
+    """Dispatches protocol requests and writes their responses to a CourseStream"""
+
+    def __init__(self, stream, workers=DEFAULT_WORKERS, max_queue=DEFAULT_MAX_QUEUE,
+                 parse_workers=DEFAULT_PARSE_WORKERS):
+        self.stream = stream
+        self.service = ScrapeService(workers=workers, max_queue=max_queue)
+        self.executor = ThreadPoolExecutor(parse_workers, thread_name_prefix="parse-worker")
+        self._lock = threading.Lock()
+        self._parsing = 0
+        self._handled = 0
+        self._index = None
+        self._index_key = None
+        self._started = time.time()
+
+    def reply(self, request_id, kind, **fields):
+        self.stream.emit({"id": request_id, "type": kind, **fields})
+
+    def handle(self, message):
+        """Dispatch one request; returns False once the worker should stop reading"""
+        if not isinstance(message, dict):
+            self.reply(None, "error", error=f"Expected a JSON object, got {type(message).__name__}")
+            return True
+        request_id = message.get("id")
+        op = message.get("op")
+        with self._lock:
+            self._handled += 1
+        if op == "scrape":
+            self.scrape(request_id, message)
+        elif op in ("parse", "requirements"):
+            self.run_in_pool(request_id, op, message)
+        elif op == "health":
+            self.reply(request_id, "health", **self.health())
+        elif op == "shutdown":
+            return False
+        else:
+            self.reply(request_id, "error", error=f"Unknown op {op!r}")
+        return True
+
+    def scrape(self, request_id, message):
+        def on_course(course):
+            self.reply(request_id, "course", course=course)
+
+        def on_done(job):
+            self.reply(request_id, "result", job=job.to_dict())
+
+        try:
+            job = self.service.submit(
+                username=message.get("username"), password=message.get("password"),
+                cookie_file=message.get("cookie_file"), job_id=message.get("job_id") or uuid.uuid4().hex,
+                on_course=on_course if message.get("stream", True) else None, on_done=on_done)
+        except QueueFullError as e:
+            self.reply(request_id, "error", error=str(e), code="queue_full")
+            return
+        self.reply(request_id, "accepted", job_id=job.id)
+
+    def run_in_pool(self, request_id, op, message):
+        with self._lock:
+            self._parsing += 1
+
+        def run():
+            try:
+                result = self.parse(message) if op == "parse" else self.requirements(message)
+                self.reply(request_id, "result", **result)
+            except Exception as e:
+                self.reply(request_id, "error", error=f"{type(e).__name__}: {e}")
+            finally:
+                with self._lock:
+                    self._parsing -= 1
+
+        self.executor.submit(run)
+
+    @staticmethod
+    def parse(message):
+        """Parse a saved Course History page given as a file path or inline HTML"""
+        if message.get("path"):
+            rows = parse_course_history_file(message["path"])
+        else:
+            rows = parse_course_history_html(message.get("html", ""))
+        courses = rows if message.get("all_rows") else unique_courses(rows)
+        return {"courses": courses}
+
+    def requirements(self, message):
+        """Look up which program requirements each course code satisfies"""
+        index = self.course_index(message.get("index_path"))
+        return {"requirements": {code: index.get(code, []) for code in message.get("codes", [])}}
+
+    def course_index(self, path=None):
+        """The requirement index, loaded once and reloaded only when the file changes"""
+        # Imported here so scrape-only workers never load the catalog scraper's dependencies
+        from ecs_requirements_scraper import load_course_index, OUTPUT_DIR, INDEX_FILENAME
+        path = path or os.path.join(OUTPUT_DIR, INDEX_FILENAME)
+        key = (path, os.path.getmtime(path))
+        with self._lock:
+            if self._index_key == key:
+                return self._index
+        index = load_course_index(path)
+        with self._lock:
+            self._index, self._index_key = index, key
+        return index
+
+    def health(self):
+        with self._lock:
+            parsing, handled = self._parsing, self._handled
+        return {
+            "pid": os.getpid(),
+            "uptime_seconds": round(time.time() - self._started, 1),
+            "requests": handled,
+            "parsing": parsing,
+            "index_loaded": self._index is not None,
+            "scrape": self.service.metrics(),
+        }
+
+    def serve(self, lines):
+        """Handle requests until shutdown or end of input, then drain in-flight work"""
+        self.reply(None, "ready", pid=os.getpid())
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                message = json.loads(line)
+            except json.JSONDecodeError as e:
+                self.reply(None, "error", error=f"Invalid JSON request: {e}")
+                continue
+            if not self.handle(message):
+                break
+        self.close()
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        self.service.shutdown(wait=True)
+        self.reply(None, "stopped", **self.health())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Persistent MySlice scrape worker (JSON lines on stdin/stdout)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="concurrent scrape jobs")
+    parser.add_argument("--max-queue", type=int, default=DEFAULT_MAX_QUEUE, help="scrape jobs allowed to wait")
+    parser.add_argument("--parse-workers", type=int, default=DEFAULT_PARSE_WORKERS)
+    parser.add_argument("--warm-browsers", action="store_true", help="start the browser pool before the first job")
+    args = parser.parse_args()
+    with stdout_stream() as stream:
+        worker = ScrapeWorker(stream, workers=args.workers, max_queue=args.max_queue,
+                              parse_workers=args.parse_workers)
+        if args.warm_browsers:
+            worker.service.browser_pool.warm()
+        # stdin carries requests only: a stray input() gets EOF instead of eating one
+        requests_in, sys.stdin = sys.stdin, open(os.devnull)
+        worker.serve(requests_in)
@@ -0,0 +1,140 @@
+from collections import namedtuple
+from contextlib import contextmanager
+import sqlite3
+import pickle
+import json
+import time
+import os
+
+# Anchored to this package so scrapers started from different directories share it
+DEFAULT_SESSION_DB = os.environ.get(
+    "SCRAPER_SESSION_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), "app_data", "sessions.db"))
+# A session nobody has validated for this long is treated as dead
+DEFAULT_MAX_IDLE = 12 * 60 * 60
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    user TEXT NOT NULL,
+    domain TEXT NOT NULL,
+    cookies TEXT NOT NULL,
+    user_agent TEXT,
+    saved_at REAL NOT NULL,
+    expires_at REAL,
+    validated_at REAL,
+    PRIMARY KEY (user, domain)
+);
+"""
+
+SessionRecord = namedtuple("SessionRecord",
+                           ["user", "domain", "cookies", "user_agent", "saved_at", "expires_at", "validated_at"])
+
+
+def live_cookies(cookies, now=None):
+    """Drop cookies whose own expiry has already passed"""
+    now = time.time() if now is None else now
+    return [cookie for cookie in cookies if not cookie.get("expiry") or cookie["expiry"] > now]
+
+
+class SessionStore:
+    """Browser session cookies per (user, domain) with expiry and validation times.
+
+    Backed by SQLite in WAL mode with a busy timeout and a connection per
+    operation, so scrape workers in several threads or processes can share
+    one store. expires_at is the earliest expiry among the domain's auth
+    cookies; validated_at is when a request last proved the session live.
+    """
+
+    def __init__(self, path=DEFAULT_SESSION_DB, max_idle=DEFAULT_MAX_IDLE):
+        self.path = path
+        self.max_idle = max_idle
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def save(self, user, domain, cookies, user_agent=None, auth_cookies=None, validated=True):
+        """Store a session, replacing any previous one for the same user and domain"""
+        now = time.time()
+        auth = [cookie for cookie in cookies if auth_cookies is None or cookie.get("name") in auth_cookies]
+        expiries = [cookie["expiry"] for cookie in auth if cookie.get("expiry")]
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions (user, domain, cookies, user_agent, saved_at, expires_at, validated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (user, domain, json.dumps(cookies), user_agent, now,
+                 min(expiries) if expiries else None, now if validated else None),
+            )
+
+    def load(self, user, domain):
+        """Return the stored SessionRecord, expired or not, or None"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT user, domain, cookies, user_agent, saved_at, expires_at, validated_at "
+                "FROM sessions WHERE user = ? AND domain = ?", (user, domain)).fetchone()
+        if row is None:
+            return None
+        return SessionRecord(row[0], row[1], json.loads(row[2]), *row[3:])
+
+    def expired(self, record, now=None):
+        """True when a session is clearly dead and replaying it would be wasted work"""
+        now = time.time() if now is None else now
+        if record.expires_at is not None and record.expires_at <= now:
+            return True
+        return now - (record.validated_at or record.saved_at) > self.max_idle
+
+    def usable(self, user, domain):
+        """Return the stored record if it may still be live, otherwise None"""
+        record = self.load(user, domain)
+        if record is None or self.expired(record):
+            return None
+        return record._replace(cookies=live_cookies(record.cookies))
+
+    def mark_validated(self, user, domain):
+        with self._connect() as conn:
+            conn.execute("UPDATE sessions SET validated_at = ? WHERE user = ? AND domain = ?",
+                         (time.time(), user, domain))
+
+    def invalidate(self, user, domain):
+        """Forget a dead session's cookies but keep the row, so it reads as expired"""
+        with self._connect() as conn:
+            conn.execute("UPDATE sessions SET cookies = '[]', expires_at = 0, validated_at = NULL "
+                         "WHERE user = ? AND domain = ?", (user, domain))
+
+    def validate(self, user, domain, probe, fresh_for=300):
+        """Check a session over HTTP with probe(record) -> bool, without a browser.
+
+        A session validated within fresh_for seconds is trusted without a
+        request. Returns the live record, or None after invalidating a dead one.
+        """
+        record = self.usable(user, domain)
+        if record is None:
+            return None
+        if record.validated_at and time.time() - record.validated_at < fresh_for:
+            return record
+        if probe(record):
+            self.mark_validated(user, domain)
+            return record
+        self.invalidate(user, domain)
+        return None
+
+    def import_pickle(self, user, domain, path, auth_cookies=None):
+        """One-time migration of a legacy cookie pickle; the session is left unvalidated"""
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "rb") as f:
+                cookies = pickle.load(f)
+        except Exception as e:
+            print(f"⚠️ Could not import cookies from {path}: {e}")
+            return None
+        self.save(user, domain, cookies, auth_cookies=auth_cookies, validated=False)
+        return self.load(user, domain)
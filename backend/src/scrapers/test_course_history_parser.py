@@ -0,0 +1,70 @@
+"""Browser-free extraction of a synthetic Course History grid.
+
+    python -m pytest backend/src/scrapers/test_course_history_parser.py
+"""
+import tempfile
+import unittest
+import os
+
+from course_history_parser import parse_course_history_html, parse_course_history_file, unique_courses
+
+
+def grid_row(n, name, term, grade=None, units=None, grade_prefix="GRADE_TBL_GRADE_INPUT"):
+    cells = [f'<td><span id="CRSE_NAME${n}">{name}</span></td>',
+             f'<td><span id="TERM_TBL_DESCR${n}">{term}</span></td>']
+    if grade is not None:
+        cells.append(f'<td><span id="{grade_prefix}${n}">{grade}</span></td>')
+    if units is not None:
+        cells.append(f'<td><span id="STDNT_ENRL_UNITS_TAKEN${n}">{units}</span></td>')
+    return "<tr>" + "".join(cells) + "</tr>"
+
+
+PAGE = "<html><body><table>" + "".join([
+    grid_row(0, "CIS 151 - Fundamentals of Computing", "Fall 2023", "A", "3.00"),
+    grid_row(1, "MAT 295 - Calculus I", "Fall 2023", "B+", "4.00"),
+    # Same code and term as row 0, e.g. a repeated grid line
+    grid_row(2, "CIS 151 - Fundamentals of Computing", "Fall 2023", "A", "3.00"),
+    # Blank course name
+    grid_row(3, "", "Fall 2023", "A", "3.00"),
+    # Grade only in the fallback column, units missing
+    grid_row(4, "WRT 105 - Studio 1", "Spring 2024", "A-", grade_prefix="CRSE_GRADE_OFF"),
+    # Same code in another term is a separate course
+    grid_row(10, "CIS 151 - Fundamentals of Computing", "Spring 2024",
+             '<span class="PSHYPERLINK">IP</span>', "3.00"),
+]) + "</table></body></html>"
+
+EXPECTED = [
+    ("CIS 151", "Fall 2023", "A", "3.00"),
+    ("MAT 295", "Fall 2023", "B+", "4.00"),
+    ("WRT 105", "Spring 2024", "A-", "Unknown"),
+    ("CIS 151", "Spring 2024", "IP", "3.00"),
+]
+
+
+def summarize(courses):
+    return [(c["course_code"], c["term"], c["grade"], c["credits"]) for c in courses]
+
+
+class CourseHistoryParserTest(unittest.TestCase):
+
+    def test_rows_in_page_order(self):
+        rows = parse_course_history_html(PAGE)
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[0]["course_name"], "CIS 151 - Fundamentals of Computing")
+
+    def test_unique_courses_drop_duplicate_and_blank_rows(self):
+        self.assertEqual(summarize(unique_courses(parse_course_history_html(PAGE))), EXPECTED)
+
+    def test_bytes_and_file_match(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "course_history.html")
+            with open(path, "w") as f:
+                f.write(PAGE)
+            self.assertEqual(parse_course_history_file(path), parse_course_history_html(PAGE.encode()))
+
+    def test_page_without_grid(self):
+        self.assertEqual(parse_course_history_html("<html><body>Sign in</body></html>"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+"""Incremental merge of scraped rows into a student's stored record.
+
+    python -m pytest backend/src/scrapers/test_course_history_store.py
+"""
+import tempfile
+import unittest
+
+from course_history_store import load_history, save_history, merge_rows, history_courses, frozen_terms
+
+
+def course(code, term, grade, credits="3.00"):
+    return {"course_code_name": code, "course_code": code, "course_name": code,
+            "grade": grade, "credits": credits, "term": term}
+
+
+FIRST_SCRAPE = [
+    course("CIS 151", "Fall 2023", "A"),
+    course("MAT 295", "Fall 2023", "B+", "4.00"),
+    course("CIS 252", "Spring 2024", "IP"),
+    course("WRT 105", "Spring 2024", "A-"),
+]
+
+
+class MergeRowsTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.history_dir = tmp.name
+        self.history = load_history("nobody", history_dir=self.history_dir)
+        merge_rows(self.history, FIRST_SCRAPE)
+
+    def test_first_merge_adds_everything(self):
+        history = load_history("nobody", history_dir=self.history_dir)
+        delta = merge_rows(history, FIRST_SCRAPE)
+        self.assertEqual(delta, {"added": FIRST_SCRAPE, "changed": [], "removed": []})
+        self.assertEqual(history_courses(history), FIRST_SCRAPE)
+
+    def test_overlapping_scrape_reports_only_changes(self):
+        graded = course("CIS 252", "Spring 2024", "B")
+        new_term = course("CIS 275", "Fall 2024", "IP")
+        # Fall 2023 is final, so only the other terms are read again
+        skipped = frozen_terms(self.history)
+        self.assertEqual(skipped, {"Fall 2023"})
+        delta = merge_rows(self.history, [graded, course("WRT 105", "Spring 2024", "A-"), new_term], skipped)
+
+        self.assertEqual(delta, {"added": [new_term], "changed": [graded], "removed": []})
+        self.assertEqual(history_courses(self.history), [
+            course("CIS 151", "Fall 2023", "A"),
+            course("MAT 295", "Fall 2023", "B+", "4.00"),
+            graded,
+            course("WRT 105", "Spring 2024", "A-"),
+            new_term,
+        ])
+        self.assertEqual(frozen_terms(self.history), {"Fall 2023", "Spring 2024"})
+
+    def test_vanished_row_of_a_scanned_term_is_removed(self):
+        delta = merge_rows(self.history, [course("CIS 252", "Spring 2024", "IP")], {"Fall 2023"})
+        self.assertEqual(delta["removed"], [course("WRT 105", "Spring 2024", "A-")])
+        self.assertEqual(len(history_courses(self.history)), 3)
+
+    def test_empty_scrape_removes_nothing(self):
+        delta = merge_rows(self.history, [], {"Fall 2023"})
+        self.assertEqual(delta, {"added": [], "changed": [], "removed": []})
+        self.assertEqual(history_courses(self.history), FIRST_SCRAPE)
+
+    def test_saved_record_round_trips(self):
+        self.history["user"] = "someone@example"
+        save_history(self.history, history_dir=self.history_dir)
+        self.assertEqual(history_courses(load_history("someone@example", history_dir=self.history_dir)), FIRST_SCRAPE)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+"""Regression test: requirements extracted from a saved catalog page.
+
+    python -m pytest backend/src/scrapers/test_ecs_requirements_scraper.py
+
+The golden file next to the saved page was produced by the original
+(pre-optimization) extractor, so any change to section walking, dedupe or
+categorization that alters the output shows up here.
+"""
+import importlib.util
+import unittest
+import json
+import os
+
+from ecs_requirements_scraper import parse_catalog_page, extract_program_requirements
+
+EXAMPLES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "public", "examples")
+SAVED_PAGE = os.path.join(EXAMPLES_DIR, "Program_ Computer Science, BS - Syracuse University - Modern Campus Catalog™.html")
+GOLDEN = SAVED_PAGE[:-len(".html")] + ".requirements.json"
+
+
+class SavedPageTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with open(SAVED_PAGE, "rb") as f:
+            cls.content = f.read()
+        with open(GOLDEN, "r") as f:
+            cls.expected = json.load(f)
+
+    def check(self, parser, only_core=True):
+        soup = parse_catalog_page(self.content, parser=parser, only_core=only_core)
+        self.assertEqual(extract_program_requirements("Computer Science", soup), self.expected)
+
+    def test_html_parser(self):
+        self.check("html.parser")
+
+    def test_html_parser_full_page(self):
+        self.check("html.parser", only_core=False)
+
+    @unittest.skipUnless(importlib.util.find_spec("lxml"), "lxml is not installed")
+    def test_lxml(self):
+        self.check("lxml")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+"""Page classification over small HTML snippets, in Python and in the browser script.
+
+    python -m pytest backend/src/scrapers/test_page_state.py
+
+The in-browser cases run CLASSIFY_SCRIPT under jsdom (backend/node_modules)
+and are skipped when node or jsdom is not installed.
+"""
+import subprocess
+import unittest
+import shutil
+import json
+import os
+
+from page_state import PageState, classify_page, _resolve, SIGNATURES, TEXT_SIGNATURES, CLASSIFY_SCRIPT
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..")
+MYSLICE = "https://myslice.ps.syr.edu/psp/PTL9PROD/EMPLOYEE/EMPL/h/?tab=DEFAULT"
+LOGIN_URL = "https://myslice.ps.syr.edu/psp/PTL9PROD/?cmd=login"
+DUO_SCRIPT = "<script>window.duo = 'Duo Push';</script>"
+
+
+def page(body, head=""):
+    return f"<html><head>{head}</head><body>{body}</body></html>"
+
+
+# (name, html, url, expected state)
+CASES = [
+    ("saml url", page("Redirecting..."), "https://sso.syr.edu/idp/profile/SAML2/Redirect/SSO", PageState.SAML),
+    ("error", page("<p>An error has occurred that has stopped this transaction from continuing.</p>"
+                   '<span id="CRSE_NAME$0">CIS 151</span>'), MYSLICE, PageState.ERROR),
+    ("session timeout", page("<h1>Your session has timed out.</h1>"), MYSLICE, PageState.SESSION_TIMEOUT),
+    ("course history", page('<span id="CRSE_NAME$0">CIS 151</span>'), MYSLICE, PageState.COURSE_HISTORY),
+    ("dashboard", page('<div id="pthdr2container"></div>'), MYSLICE, PageState.DASHBOARD),
+    ("login form", page('<input id="userid" name="userid">'), MYSLICE, PageState.LOGIN),
+    ("login text", page("<h2>Sign in to your account</h2>"), MYSLICE, PageState.LOGIN),
+    ("two factor", page("<button>Send Me a Push</button>"), MYSLICE, PageState.TWO_FACTOR),
+    ("two factor code", page("<label>Enter your passcode</label>"), MYSLICE, PageState.TWO_FACTOR),
+    ("login beats two factor", page('<input id="userid"><p>Two-Factor Authentication required</p>'),
+     MYSLICE, PageState.LOGIN),
+    ("duo only in script", page("<p>Welcome</p>", head=DUO_SCRIPT), MYSLICE, PageState.UNKNOWN),
+    ("unknown", page("<p>Welcome</p>"), MYSLICE, PageState.UNKNOWN),
+    # The URL heuristic: "login" in the URL only decides when the content matched no higher state
+    ("login url, two factor text", page("<p>Duo Security</p>"), LOGIN_URL, PageState.LOGIN),
+    ("login url, unknown page", page("<p>Welcome</p>"), LOGIN_URL, PageState.LOGIN),
+    ("login url, dashboard page", page('<div id="pthdr2container"></div>'), LOGIN_URL, PageState.DASHBOARD),
+    ("login url, course history page", page('<span id="CRSE_NAME$3">MAT 295</span>'), LOGIN_URL,
+     PageState.COURSE_HISTORY),
+    ("login url, timeout page", page("<p>Please log in again.</p>"), LOGIN_URL, PageState.SESSION_TIMEOUT),
+]
+
+# Runs CLASSIFY_SCRIPT on each case under jsdom; jsdom has no innerText, so it
+# is approximated by textContent without the elements that never render
+JSDOM_RUNNER = r"""
+const { JSDOM } = require('jsdom');
+const input = JSON.parse(require('fs').readFileSync(0, 'utf8'));
+const classify = new Function('document', 'arguments', input.script);
+const results = input.pages.map((html) => {
+    const { window } = new JSDOM(html);
+    Object.defineProperty(window.HTMLElement.prototype, 'innerText', {
+        get() {
+            const clone = this.cloneNode(true);
+            clone.querySelectorAll('script, style, noscript, template').forEach((el) => el.remove());
+            return clone.textContent;
+        },
+    });
+    return classify(window.document, input.args);
+});
+process.stdout.write(JSON.stringify(results));
+"""
+
+
+def jsdom_available():
+    return bool(shutil.which("node")) and os.path.isdir(os.path.join(BACKEND_DIR, "node_modules", "jsdom"))
+
+
+class ClassifyPageTest(unittest.TestCase):
+
+    def test_python_signatures(self):
+        for name, html, url, expected in CASES:
+            with self.subTest(name):
+                self.assertEqual(classify_page(html, url).state, expected)
+                self.assertEqual(classify_page(html.encode(), url).state, expected)
+
+    @unittest.skipUnless(jsdom_available(), "node or jsdom is not installed")
+    def test_browser_script_signatures(self):
+        args = [[state.name for state, _ in SIGNATURES], [pattern for _, pattern in SIGNATURES],
+                [state.name for state, _ in TEXT_SIGNATURES], [pattern for _, pattern in TEXT_SIGNATURES]]
+        payload = json.dumps({"script": CLASSIFY_SCRIPT, "args": args, "pages": [html for _, html, _, _ in CASES]})
+        output = subprocess.run(["node", "-e", JSDOM_RUNNER], input=payload, cwd=BACKEND_DIR,
+                                capture_output=True, text=True, check=True).stdout
+        for (name, _, url, expected), found in zip(CASES, json.loads(output)):
+            with self.subTest(name):
+                status = _resolve({PageState[state]: text for state, text in found.items()}, url)
+                self.assertEqual(status.state, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,6 @@
 import re
+import sys
 import time
-import pickle
 import os
 import pandas as pd
 import requests # Added for making HTTP requests
@@ -13,6 +13,10 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, WebDriverException, InvalidCookieDomainException, JavascriptException
 
+# Shared session store lives with the MySlice scrapers
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend", "src", "scrapers"))
+from session_store import SessionStore
+
 # --- Configuration ---
 DEGREE_WORKS_URL = "https://degreeworks.syr.edu/worksheets/WEB31"
 # API Endpoints
@@ -20,8 +24,11 @@ API_MYSELF_URL = "https://degreeworks.syr.edu/api/myself" # Endpoint to get curr
 # !! IMPORTANT: Verify this API endpoint and parameters from browser DevTools !!
 API_AUDIT_URL_TEMPLATE = "https://degreeworks.syr.edu/api/audit?studentId={student_id}&school=UGRD&degree=BS&is-processNew=false&audit-type=AA&auditId=&include-inprogress=true&include-preregistered=true&aid-term="
 
-COOKIE_FILE = "degree_works_cookies.pkl"
 COOKIE_DOMAIN_URL = "https://degreeworks.syr.edu/"
+# Session store key for Degree Works and the cookie that carries its login
+SESSION_DOMAIN = "degreeworks.syr.edu"
+AUTH_COOKIES = ["X-AUTH-TOKEN"]
+SESSION_USER = os.environ.get("SCRAPER_USER", "default")
 WAIT_TIMEOUT = 60 # Timeout for general waits
 
 # Base Headers (User-Agent will be added dynamically)
@@ -69,7 +76,7 @@ def setup_driver():
         return None, None
 
 # Modified save_cookies to return the cookies list
-def save_cookies(driver):
+def save_cookies(driver, user_agent=None):
     """Guides manual login and saves/returns cookies."""
     if not driver:
         print("❌ Driver not initialized, cannot save cookies.")
@@ -108,9 +115,9 @@ def save_cookies(driver):
              print("❌ Error: X-AUTH-TOKEN cookie not found after login.")
              return None
 
-        with open(COOKIE_FILE, "wb") as f:
-            pickle.dump(valid_cookies, f)
-        print(f"✅ {len(valid_cookies)} Cookies saved to {COOKIE_FILE}")
+        SessionStore().save(SESSION_USER, SESSION_DOMAIN, valid_cookies,
+                            user_agent=user_agent, auth_cookies=AUTH_COOKIES)
+        print(f"✅ {len(valid_cookies)} Cookies saved to the session store")
         return valid_cookies # Return the list of cookies
     except Exception as e:
         print(f"❌ Error saving cookies: {e}")
@@ -379,42 +386,69 @@ def calculate_credits(courses, total_credits_required=120):
     return {'credits_earned': credits_earned, 'credits_in_progress': credits_in_progress, 'credits_needed': credits_needed}
 
 # --- Main Execution Logic ---
+def load_saved_session():
+    """Return (cookies, user_agent, student_id) for a stored session the API still accepts.
+
+    Clearly expired sessions are skipped without a request; otherwise one
+    /api/myself call decides, so no browser is needed to check validity.
+    That call also yields the student ID, so it is made even for a session
+    validated moments ago.
+    """
+    found = {}
+
+    def probe(record):
+        if not record.cookies or not record.user_agent:
+            return False
+        print("\nChecking saved Degree Works session...")
+        found["student_id"] = get_student_info_api(record.cookies, record.user_agent)
+        return bool(found["student_id"])
+
+    record = SessionStore().validate(SESSION_USER, SESSION_DOMAIN, probe, fresh_for=0)
+    if record is None:
+        if "student_id" in found:
+            print("ℹ️ Saved session was rejected, a fresh login is needed.")
+        return None, None, None
+    print("✅ Saved session is still valid, skipping browser login.")
+    return record.cookies, record.user_agent, found["student_id"]
+
 def main():
     """Main function to orchestrate login, API fetch, and saving."""
     print("🚀 Starting Degree Works Scraper (API Version)...")
-    driver, user_agent = setup_driver() # Get driver and user_agent
-    if not driver or not user_agent:
-        print("❌ Exiting due to driver setup failure.")
-        return
-
     api_audit_data = None
-    saved_cookies = None
-    student_id = None
+    saved_cookies, user_agent, student_id = load_saved_session()
 
-    try:
-        # Always force manual login to get fresh cookies for API call
-        print("\nInitiating manual login process to obtain fresh cookies...")
-        saved_cookies = save_cookies(driver)
-
-        if saved_cookies:
-             # Get student ID dynamically
-             print("\nFetching student information...")
-             # Pass the dynamic user_agent to the API call
-             student_id = get_student_info_api(saved_cookies, user_agent)
-
-             if student_id:
-                # Now call the function to fetch data via API
-                # Pass the dynamic user_agent to the API call
-                api_audit_data = fetch_audit_data_api(saved_cookies, student_id, user_agent)
-             else:
-                print("❌ Could not retrieve student ID. Cannot fetch audit.")
-        else:
-             print("❌ Manual login/cookie saving failed. Cannot proceed.")
+    if student_id:
+        api_audit_data = fetch_audit_data_api(saved_cookies, student_id, user_agent)
+    else:
+        driver, user_agent = setup_driver() # Get driver and user_agent
+        if not driver or not user_agent:
+            print("❌ Exiting due to driver setup failure.")
+            return
 
-    finally:
-        if driver:
-            print("Quitting WebDriver...")
-            driver.quit()
+        try:
+            # No live saved session, so log in manually to get fresh cookies for the API call
+            print("\nInitiating manual login process to obtain fresh cookies...")
+            saved_cookies = save_cookies(driver, user_agent)
+
+            if saved_cookies:
+                 # Get student ID dynamically
+                 print("\nFetching student information...")
+                 # Pass the dynamic user_agent to the API call
+                 student_id = get_student_info_api(saved_cookies, user_agent)
+
+                 if student_id:
+                    # Now call the function to fetch data via API
+                    # Pass the dynamic user_agent to the API call
+                    api_audit_data = fetch_audit_data_api(saved_cookies, student_id, user_agent)
+                 else:
+                    print("❌ Could not retrieve student ID. Cannot fetch audit.")
+            else:
+                 print("❌ Manual login/cookie saving failed. Cannot proceed.")
+
+        finally:
+            if driver:
+                print("Quitting WebDriver...")
+                driver.quit()
 
     # --- Process Results ---
     if api_audit_data: